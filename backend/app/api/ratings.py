@@ -17,7 +17,7 @@ from flask import Blueprint, request, jsonify
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from cache_manager import cache
-from database_migration import VideoDatabase
+from database_migration import get_video_database
 from backend.services.ratings_service import RatingsService
 from backend.app.api.schemas import RatingInput
 from backend.app.core.rate_limiter import get_rate_limiter
@@ -27,7 +27,7 @@ from backend.app.admin.performance import get_metrics
 ratings_bp = Blueprint('ratings', __name__, url_prefix='/api/ratings')
 
 # Initialize service
-_database = VideoDatabase()
+_database = get_video_database()
 ratings_service = RatingsService(cache, _database)
 rate_limiter = get_rate_limiter(max_requests=5, window_seconds=10)
 
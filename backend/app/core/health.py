@@ -0,0 +1,36 @@
+"""
+backend/app/core/health.py
+
+WSGI shortcut for the uptime-monitor endpoints. GET/HEAD /ping and
+/favicon.ico are answered before Flask runs its request hooks, routing
+and response finalisation, so monitor polling stays cheap and out of
+the perf logs. The Flask routes stay registered for url_for and for any
+other method.
+"""
+import json
+
+PING_PAYLOAD = {"status": "ok", "message": "Server is reachable"}
+
+
+class HealthShortcutMiddleware:
+    """Wrap ``app.wsgi_app`` and serve the fixed health responses directly."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self._ping_body = json.dumps(PING_PAYLOAD, separators=(",", ":")).encode() + b"\n"
+        self._ping_headers = [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(self._ping_body))),
+        ]
+
+    def __call__(self, environ, start_response):
+        method = environ.get("REQUEST_METHOD")
+        if method == "GET" or method == "HEAD":
+            path = environ.get("PATH_INFO")
+            if path == "/ping":
+                start_response("200 OK", list(self._ping_headers))
+                return [] if method == "HEAD" else [self._ping_body]
+            if path == "/favicon.ico":
+                start_response("204 No Content", [])
+                return []
+        return self.wsgi_app(environ, start_response)
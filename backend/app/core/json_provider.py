@@ -0,0 +1,55 @@
+"""
+backend/app/core/json_provider.py
+
+orjson-backed JSON provider so jsonify() and request.get_json() use the
+C parser/serializer. Types orjson does not handle natively (dates, Decimal,
+dataclasses) fall through to Flask's default encoder, so responses keep
+the same shape as with the stdlib provider.
+"""
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup; Flask's stdlib provider is used instead
+    orjson = None
+
+_DUMPS_OPTIONS = 0
+if orjson is not None:
+    _DUMPS_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson doing the encoding and decoding."""
+
+    def _orjson_dumps(self, obj: Any) -> bytes:
+        option = _DUMPS_OPTIONS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Callers asking for stdlib options (indent, sort_keys, ...) get stdlib output
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)  # indented output
+        return self._app.response_class(self._orjson_dumps(obj) + b"\n", mimetype=self.mimetype)
+
+
+def install_json_provider(app) -> None:
+    """Switch ``app`` to the orjson provider when orjson is installed."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
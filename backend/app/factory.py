@@ -3,9 +3,12 @@
 from pathlib import Path
 from flask import Flask
 
+from config import get_config
 from backend.app.api.ratings import register_ratings_api
 from backend.app.api.playlists import register_playlists_api
 from backend.app.admin.routes import register_admin_routes
+from backend.app.core.health import HealthShortcutMiddleware
+from backend.app.core.json_provider import install_json_provider
 from backend.app.media.routes import media_bp
 from backend.app.metadata.routes import metadata_bp
 from backend.app.tags.routes import tags_bp
@@ -21,6 +24,11 @@ def create_app() -> Flask:
         static_folder=str(repo_root / "static"),
         root_path=str(repo_root),
     )
+    install_json_provider(app)
+    config = get_config()
+    app.config["USE_X_SENDFILE"] = config.use_x_sendfile
+    # Oversized JSON POSTs are refused with 413 before get_json() reads them
+    app.config["MAX_CONTENT_LENGTH"] = config.max_request_body
     app.register_blueprint(media_bp)
     app.register_blueprint(tags_bp)
     app.register_blueprint(metadata_bp)
@@ -78,4 +86,7 @@ def create_app() -> Flask:
     app.add_url_rule("/analytics/export", endpoint="export_analytics", view_func=legacy.export_analytics)
     app.add_url_rule("/analytics/stats", endpoint="analytics_stats", view_func=legacy.analytics_stats)
 
+    # Outermost: monitor pings never reach Flask's request hooks.
+    app.wsgi_app = HealthShortcutMiddleware(app.wsgi_app)
+
     return app
@@ -2,31 +2,35 @@
 main.py – Local Video Server  (thumbnail pipeline refactor)
 """
 
-import re
+import os
 import time
+import logging
 import mimetypes
-import random
-from datetime import datetime, timezone
+import weakref
+from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import quote
 
 from flask import (
-    Flask, Response, request, render_template, send_file,
+    Flask, Response, current_app, request, render_template, send_file, send_from_directory,
     abort, url_for, redirect, jsonify, g
 )
+from werkzeug.security import safe_join
 
 try:
     from PIL import Image
 except ImportError:
     Image = None
 
-from cache_manager import cache
+from cache_manager import cache, json_blob, loads_json_bytes
 from thumbnail_manager import (
-    generate_async as generate_thumbnail_async,
+    queue_missing as queue_missing_thumbnails,
     sync as sync_thumbnails,
 )
 from config import get_config
-import json
+from database_migration import get_video_database
+from backend.app.services.analytics_service import get_analytics_service
 
 # Register API blueprints
 try:
@@ -41,7 +45,15 @@ try:
 except ImportError:
     _admin_routes_available = False
 
+try:
+    from backend.services.ratings_service import RatingsService
+    # Hash of the filename only, so entries never go stale on rename/delete
+    _get_media_hash = lru_cache(maxsize=4096)(RatingsService.get_media_hash)
+except ImportError:
+    _get_media_hash = None
+
 app = Flask(__name__)
+log = logging.getLogger(__name__)
 
 # Register ratings API if available
 if _ratings_api_available:
@@ -77,12 +89,15 @@ VIDEO_DIR = Path("videos")
 THUMBNAIL_DIR = Path("static") / "thumbnails"
 INDEX_DEFAULT_PER_PAGE = 60
 INDEX_MAX_PER_PAGE = 120
+RELATED_PER_PAGE = 12
+RELATED_MAX_VIDEOS = 20  # related suggestions shown across all watch-page pages
+RELATED_MAX_PAGES = -(-RELATED_MAX_VIDEOS // RELATED_PER_PAGE)
 
 # Guarantee required folders exist
 THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
 GALLERY_DIR = Path("images") / "gallery"
 
-# Thread pool for misc background jobs (already used by thumbnail_manager)
+# Thread pool for misc background jobs (startup tasks)
 executor = ThreadPoolExecutor(max_workers=2)
 
 
@@ -193,33 +208,28 @@ except ImportError:
 # ────────────────────────────────────────────────────────────────────────────
 
 def _is_perf_log_enabled() -> bool:
-    """Return whether perf logging should run."""
+    """Return whether perf logging should run (and would be emitted at all)."""
     cfg = get_config()
-    return getattr(cfg, "enable_perf_log", True)
+    return getattr(cfg, "enable_perf_log", True) and app.logger.isEnabledFor(logging.INFO)
 
 
 @app.before_request
 def _perf_log_before_request():
-    enabled = _is_perf_log_enabled()
-    g._perf_log_enabled = enabled
-    if not enabled:
-        return
-    g._perf_log_start = time.perf_counter()
+    if _is_perf_log_enabled():
+        g._perf_log_start = time.perf_counter()
 
 
 @app.after_request
 def _perf_log_after_request(response):
-    if not getattr(g, "_perf_log_enabled", False):
-        return response
-    start = getattr(g, "_perf_log_start", None)
+    # Hook disabled (config flag or INFO filtered out) leaves no start time
+    start = g.get("_perf_log_start")
     if start is None:
         return response
 
     duration_ms = (time.perf_counter() - start) * 1000
-    ts = datetime.now(timezone.utc).isoformat()
+    # Timestamp comes from the handler's formatter (%(asctime)s), not per request
     app.logger.info(
-        "[PERF] ts=%s method=%s path=%s status=%s duration_ms=%.2f",
-        ts,
+        "[PERF] method=%s path=%s status=%s duration_ms=%.2f",
         request.method,
         request.path,
         response.status_code,
@@ -232,6 +242,36 @@ def _perf_log_after_request(response):
 # Utility helpers
 # ────────────────────────────────────────────────────────────────────────────
 
+# Compiled templates per Jinja environment, keyed by template name
+_TEMPLATE_CACHE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _render_template(template_name: str, **context):
+    """render_template with the compiled Template memoised per app.
+
+    Skips Jinja's loader lookup on every request while keeping Flask's
+    context processors and signals. Bypassed when templates auto-reload
+    (debug), so edits still show up without a restart.
+    """
+    env = current_app.jinja_env
+    if env.auto_reload:
+        return render_template(template_name, **context)
+    templates = _TEMPLATE_CACHE.get(env)
+    if templates is None:
+        templates = _TEMPLATE_CACHE.setdefault(env, {})
+    template = templates.get(template_name)
+    if template is None:
+        template = templates[template_name] = env.get_template(template_name)
+    return render_template(template, **context)
+
+
+def _json_blob_response(body: bytes, etag: str) -> Response:
+    """Send pre-serialized JSON; a matching If-None-Match gets an empty 304."""
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
 def get_video_path(filename: str) -> Path:
     """Return the absolute Path to a video inside VIDEO_DIR."""
     return VIDEO_DIR / filename
@@ -253,11 +293,12 @@ def _extract_existing_filename(data: dict | None) -> tuple[str | None, tuple[dic
 
 def ensure_thumbnails_exist(video_list: list[str]) -> None:
     """
-    Queue thumbnail generation for every file in `video_list`.
-    `thumbnail_manager` handles duplication and existence checks.
+    Queue thumbnail generation for any file in `video_list` that lacks one.
+    The thumbnail workers filter against the thumbnail directory, so the
+    request thread does one queue put regardless of list size.
     """
-    for vid in video_list:
-        generate_thumbnail_async(vid)
+    if video_list:
+        queue_missing_thumbnails(video_list)
 
 
 # --- Sidecar tag aggregation (sidecar-first) ---
@@ -284,7 +325,7 @@ def _iter_sidecars(vdir: Path):
 
 def _read_tags_from_sidecar(p: Path) -> list[str]:
     try:
-        data = json.loads(p.read_text(encoding="utf-8", errors="ignore"))
+        data = loads_json_bytes(p.read_bytes())
         tags = data.get("tags", [])
         if isinstance(tags, list):
             return [
@@ -488,13 +529,18 @@ def index():
     per_page = max(1, min(per_page, INDEX_MAX_PER_PAGE))
     offset = (page - 1) * per_page
 
+    # Prev/Next links carry a keyset cursor; a bare ?page= still works via OFFSET
+    cursor = request.args.get("cursor") or None
+
     total_videos = len(cache.get_video_list())
     if offset >= total_videos and total_videos:
         page = max(1, (total_videos - 1) // per_page + 1)
         offset = (page - 1) * per_page
 
     # Metadata via cache_manager
-    video_data = cache.get_all_video_data(sort_param, reverse, limit=per_page, offset=offset)
+    video_data, next_cursor, prev_cursor = cache.get_video_page(
+        sort_param, reverse, per_page, cursor=cursor, offset=offset
+    )
     total_pages = max(1, (total_videos + per_page - 1) // per_page)
     favorites_list = cache.get_favorites()
 
@@ -504,13 +550,15 @@ def index():
     # Load config for feature flags
     config = get_config()
 
-    return render_template(
+    return _render_template(
         "index.html",
         videos=video_data,
         current_sort=sort_param,
         current_order=order,
         current_page=page,
         total_pages=total_pages,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
         per_page=per_page,
         total_videos=total_videos,
         favorites_list=favorites_list,
@@ -529,27 +577,28 @@ def watch_video(filename: str):
 
     # Compute media_hash (use RatingsService utility if available)
     try:
-        from backend.services.ratings_service import RatingsService
-        media_hash = RatingsService.get_media_hash(filename)
-    except (ImportError, Exception):
-        # Fallback: use filename as hash
+        media_hash = _get_media_hash(filename)
+    except Exception:
+        # Fallback: use filename as hash (also covers RatingsService missing)
         media_hash = filename
 
-    # Pull all cached metadata in bulk
-    ratings = cache.get_ratings()
-    views = cache.get_views()
-    all_tags = cache.get_tags()
-    favorites_list = cache.get_favorites()
-
-    current_tags = _merge_video_tags(all_tags.get(filename, []))
-    related_videos = cache.get_related_videos_optimized(filename, 20)
+    # Pagination: fetch only the requested page of related videos
+    try:
+        page = int(request.args.get("page", "1"))
+    except (TypeError, ValueError):
+        page = 1
+    per_page = RELATED_PER_PAGE
+    page = max(1, min(page, RELATED_MAX_PAGES))
+    offset = (page - 1) * per_page
 
-    # Pagination
-    page = int(request.args.get("page", 1))
-    per_page = 12
-    start, end = (page - 1) * per_page, (page - 1) * per_page + per_page
-    paginated = related_videos[start:end]
-    total = (len(related_videos) + per_page - 1) // per_page
+    # This video's metadata, favorites and related page in one cache call
+    watch_data = cache.get_watch_page_data(
+        filename, offset=offset, limit=min(per_page, RELATED_MAX_VIDEOS - offset)
+    )
+    current_tags = _merge_video_tags(watch_data["tags"])
+    paginated = watch_data["related"]
+    pages, partial = divmod(min(watch_data["related_total"], RELATED_MAX_VIDEOS), per_page)
+    total = pages + (partial > 0)
 
     # Thumbnails for related videos
     ensure_thumbnails_exist([v["filename"] for v in paginated])
@@ -557,17 +606,17 @@ def watch_video(filename: str):
     # Load config for feature flags
     config = get_config()
 
-    return render_template(
+    return _render_template(
         "watch.html",
         filename=filename,
         media_hash=media_hash,
-        ratings=ratings,
-        views=views,
+        rating=watch_data["rating"],
+        view_count=watch_data["views"],
         tags=current_tags,
         videos=paginated,
         page=page,
         total_pages=total,
-        favorites_list=favorites_list,
+        favorites_list=watch_data["favorites"],
         feature_vr_simplify=config.feature_vr_simplify,
         feature_previews=config.feature_previews,
     )
@@ -609,7 +658,7 @@ def popular_page():
     # Load config for feature flags
     config = get_config()
 
-    return render_template(
+    return _render_template(
         "popular.html",
         videos=video_data,
         current_sort=sort_param,
@@ -626,42 +675,27 @@ def popular_page():
 
 @app.route("/video/<path:filename>")
 def stream_video(filename: str):
-    """Byte-range streaming endpoint with basic Range support."""
-    file_path = get_video_path(filename)
-    if not file_path.exists():
-        abort(404)
+    """Video endpoint; Werkzeug handles Range, If-Range, ETag and 416s.
 
-    mime_type, _ = mimetypes.guess_type(str(file_path))
-    mime_type = mime_type or "application/octet-stream"
-    range_hdr = request.headers.get("Range")
-
-    if not range_hdr:
-        # No range – send whole file
-        return send_file(str(file_path), mimetype=mime_type)
-
-    size = file_path.stat().st_size
-    byte1, byte2 = 0, None
-    m = re.search(r"bytes=(\d+)-(\d*)", range_hdr)
-    if m:
-        g1, g2 = m.groups()
-        if g1:
-            byte1 = int(g1)
-        if g2:
-            byte2 = int(g2)
-
-    if byte2 is None or byte2 >= size:
-        byte2 = size - 1
-    length = byte2 - byte1 + 1
-
-    with file_path.open("rb") as fh:
-        fh.seek(byte1)
-        data = fh.read(length)
-
-    rv = Response(data, 206, mimetype=mime_type, direct_passthrough=True)
-    rv.headers["Content-Range"] = f"bytes {byte1}-{byte2}/{size}"
-    rv.headers["Accept-Ranges"] = "bytes"
-    rv.headers["Content-Length"] = str(length)
-    return rv
+    The file goes through wsgi.file_wrapper (sendfile under gunicorn/uwsgi),
+    or to the front server when USE_X_SENDFILE is on, so no byte range is
+    copied through Python here. Missing or out-of-tree paths are 404s.
+    With x_accel_redirect_prefix configured, nginx serves the file instead.
+    """
+    accel_prefix = get_config().x_accel_redirect_prefix
+    if accel_prefix:
+        video_path = safe_join(os.path.abspath(VIDEO_DIR), filename)
+        if video_path is None or not os.path.isfile(video_path):
+            abort(404)
+        mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        return Response(headers={
+            "X-Accel-Redirect": accel_prefix + quote(filename),
+            "Content-Type": mime_type,
+        })
+
+    return send_from_directory(
+        os.path.abspath(VIDEO_DIR), filename, conditional=True, etag=True
+    )
 
 
 @app.route("/get_views")
@@ -669,10 +703,9 @@ def stream_video(filename: str):
 def get_views_route():
     """Optimized views endpoint using cache"""
     try:
-        views = cache.get_views()
-        return jsonify(views)
+        return _json_blob_response(*cache.views_json())
     except OSError as e:
-        print(f"Error loading views: {e}")
+        log.exception("Error loading views")
         return jsonify({"error": str(e)}), 500
 
 
@@ -733,14 +766,8 @@ def add_tag():
     if not tag.startswith("#"):
         tag = "#" + tag
 
-    # Get current tags from cache
-    all_tags = cache.get_tags()
-    current_tags = all_tags.get(filename, [])
-
-    # Check for duplicates case-insensitively
-    if tag.lower() not in [t.lower() for t in current_tags]:
-        current_tags.append(tag)
-        cache.update_tags(filename, current_tags)
+    # Case-insensitive duplicate check and a single-row insert in the cache
+    current_tags = cache.add_tag(filename, tag)
 
     return {"success": True, "tags": current_tags}
 
@@ -759,13 +786,8 @@ def delete_tag():
     if not tag:
         return {"error": "No tag provided"}, 400
 
-    # Get current tags from cache
-    all_tags = cache.get_tags()
-    current_tags = all_tags.get(filename, [])
-
-    if current_tags:
-        updated_tags = [t for t in current_tags if t.lower() != tag.lower()]
-        cache.update_tags(filename, updated_tags)
+    updated_tags = cache.remove_tag(filename, tag)
+    if updated_tags is not None:
         return {"success": True, "tags": updated_tags}
 
     return {"error": "Video not found in tags"}, 404
@@ -776,8 +798,7 @@ def popular_tags_api():
     """Expose DB-backed popular tags for autocomplete."""
     limit = request.args.get('limit', default=50, type=int)
     limit = max(1, min(limit or 50, 200))
-    tags = cache.get_popular_tags(limit)
-    return jsonify({"tags": tags})
+    return _json_blob_response(*cache.popular_tags_json(limit))
 
 
 @app.route('/api/tags/video')
@@ -804,14 +825,7 @@ def toggle_favorite():
         body, status = err
         return body, status
 
-    favorites = cache.get_favorites()
-
-    if filename in favorites:
-        favorites.remove(filename)
-    else:
-        favorites.append(filename)
-
-    cache.update_favorites(favorites)
+    favorites = cache.toggle_favorite(filename)
 
     return jsonify({"success": True, "favorites": favorites})
 
@@ -836,10 +850,9 @@ def favorites_page():
     per_page = max(1, min(per_page, INDEX_MAX_PER_PAGE))
     offset = (page - 1) * per_page
 
-    # Get all video data, then filter by favorites
-    all_video_data = cache.get_all_video_data(sort_param, reverse)
+    # Only the favorited videos, fetched in bulk
     favorites_list = cache.get_favorites()
-    video_data = [v for v in all_video_data if v["filename"] in favorites_list]
+    video_data = cache.get_videos_by_filenames(favorites_list, sort_param, reverse)
 
     total_videos = len(video_data)
     if offset >= total_videos and total_videos:
@@ -855,7 +868,7 @@ def favorites_page():
     # Load config for feature flags
     config = get_config()
 
-    return render_template(
+    return _render_template(
         "favorites.html",
         videos=paginated_data,
         current_sort=sort_param,
@@ -887,21 +900,24 @@ def _display_title_for_video(video: dict) -> str:
 def _match_and_rank_video(video: dict, tokens: list[str], normalized_query: str):
     """Return sort-key for a match, else None when video does not match."""
     display_title = _display_title_for_video(video)
-    filename = str(video.get("filename", ""))
-    tags = [str(tag) for tag in (video.get("tags") or [])]
-
     title_l = display_title.lower()
-    filename_l = filename.lower()
-    tags_l = [tag.lower() for tag in tags]
+    filename_l = str(video.get("filename", "")).lower()
+    # One lowered haystack per video instead of rescanning the tag list for
+    # every token; "\n" never occurs inside a whitespace-split token, so a
+    # token cannot match across two tags
+    tags_l = "\n".join(str(tag) for tag in (video.get("tags") or [])).lower()
 
+    title_hits = filename_hits = tag_hits = 0
     for token in tokens:
-        if token in title_l or token in filename_l or any(token in tag for tag in tags_l):
-            continue
-        return None
+        in_title = token in title_l
+        in_filename = token in filename_l
+        in_tags = token in tags_l
+        if not (in_title or in_filename or in_tags):
+            return None
+        title_hits += in_title
+        filename_hits += in_filename
+        tag_hits += in_tags
 
-    title_hits = sum(1 for token in tokens if token in title_l)
-    filename_hits = sum(1 for token in tokens if token in filename_l)
-    tag_hits = sum(1 for token in tokens if any(token in tag for tag in tags_l))
     exact_phrase_in_title = bool(normalized_query and normalized_query in title_l)
 
     if exact_phrase_in_title:
@@ -937,7 +953,7 @@ def search_page():
         abort(503, description="Search requires database-backed runtime metadata.")
 
     if not tokens:
-        return render_template(
+        return _render_template(
             "search.html",
             query=query,
             videos=[],
@@ -959,7 +975,7 @@ def search_page():
     results = [video for _, video in ranked_results]
     ensure_thumbnails_exist([video["filename"] for video in results])
 
-    return render_template(
+    return _render_template(
         "search.html",
         query=query,
         videos=results,
@@ -972,9 +988,8 @@ def search_page():
 @performance_monitor("route_random")
 def random_video():
     """Optimized random video selection using cached list"""
-    videos = cache.get_video_list()
-    if videos:
-        selected_video = random.choice(videos)
+    selected_video = cache.get_random_video()
+    if selected_video:
         return redirect(url_for('watch_video', filename=selected_video))
     return redirect(url_for('index'))
 
@@ -985,7 +1000,7 @@ def tags_page():
     """Tags page (canonical DB-backed read path)."""
     _prune_orphaned_tag_entries()
     tags = cache.get_all_unique_tags()
-    return render_template('tags.html', tags=tags, tag_count=len(tags))
+    return _render_template('tags.html', tags=tags, tag_count=len(tags))
 
 
 @app.route('/tag/<tag>')
@@ -1000,74 +1015,76 @@ def tag_videos(tag):
     # Ensure thumbnails exist
     ensure_thumbnails_exist([v['filename'] for v in filtered_videos])
 
-    return render_template('tag_videos.html', tag=normalized_tag, videos=filtered_videos)
+    return _render_template('tag_videos.html', tag=normalized_tag, videos=filtered_videos)
 
 
 @app.route('/best-of')
 @performance_monitor("route_best_of")
 def best_of():
     """Best of page - videos with 4+ star ratings"""
-    all_video_data = cache.get_all_video_data()
-    video_data = [video for video in all_video_data if video.get('rating', 0) >= 4]
+    # Rated 4+, highest first
+    video_data = cache.get_videos_min_rating(4, sort_by='rating', reverse=True)
     favorites_list = cache.get_favorites()
     
-    # Sort by rating (highest first)
-    video_data.sort(key=lambda x: x.get('rating', 0), reverse=True)
-    
     # Ensure thumbnails exist
     ensure_thumbnails_exist([v['filename'] for v in video_data])
     
-    return render_template('best_of.html', videos=video_data, favorites_list=favorites_list)
+    return _render_template('best_of.html', videos=video_data, favorites_list=favorites_list)
 
 
 @app.route('/links')
 def links():
     """Links page"""
-    return render_template('links.html')
+    return _render_template('links.html')
+
+
+_GALLERY_IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp'})
+# (directory mtime_ns, sorted image names, /api/gallery JSON blob), swapped as one tuple
+_EMPTY_GALLERY_LISTING = (None, (), json_blob({'images': []}))
+_gallery_listing: tuple[int | None, tuple[str, ...], tuple[bytes, str]] = _EMPTY_GALLERY_LISTING
+
+
+def _current_gallery_listing() -> tuple[int | None, tuple[str, ...], tuple[bytes, str]]:
+    """Gallery listing and its JSON blob, rebuilt together only when the directory mtime changes."""
+    global _gallery_listing
+    listing = _gallery_listing
+    try:
+        mtime = GALLERY_DIR.stat().st_mtime_ns
+        if listing[0] != mtime:
+            with os.scandir(GALLERY_DIR) as it:
+                files = tuple(sorted(
+                    entry.name for entry in it
+                    if os.path.splitext(entry.name)[1].lower() in _GALLERY_IMAGE_EXTS
+                    and entry.is_file()
+                ))
+            listing = (mtime, files, json_blob({'images': list(files)}))
+            _gallery_listing = listing
+    except OSError:
+        return _EMPTY_GALLERY_LISTING
+    return listing
+
+
+def _gallery_image_files() -> tuple[str, ...]:
+    """Sorted image filenames in GALLERY_DIR."""
+    return _current_gallery_listing()[1]
 
 
 @app.route('/gallery')
 def gallery():
     """Gallery page for images"""
-    from database_migration import VideoDatabase
-    
-    gallery_dir = Path('images/gallery')
-    images = []
-    if gallery_dir.exists():
-        # Get all image files
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
-        images = [
-            img.name for img in gallery_dir.iterdir()
-            if img.is_file() and img.suffix.lower() in image_extensions
-        ]
-    
-    print(f"\n=== GALLERY DEBUG ===")
-    print(f"All files in gallery: {images}")
+    images = list(_gallery_image_files())
     
     # Exclude images that are already in groups
     try:
-        db = VideoDatabase()
-        grouped_images = set()
-        all_groups = db.get_gallery_groups()
-        print(f"Total groups: {len(all_groups)}")
-        for group in all_groups:
-            group_items = db.get_group_images(group['id'])
-            print(f"Group '{group['name']}' (ID {group['id']}) items: {group_items}")
-            grouped_images.update(group_items)
-        
-        print(f"All grouped images: {grouped_images}")
-        print(f"Gallery before filter: {len(images)} images")
+        grouped_images = get_video_database().get_grouped_image_paths()
         images = [img for img in images if img not in grouped_images]
-        print(f"Gallery after filter: {len(images)} images")
-        print(f"Filtered images: {images}")
-    except Exception as e:
-        print(f"ERROR: {e}")
-        import traceback
-        traceback.print_exc()
+        log.debug("Gallery after excluding %d grouped images: %d images",
+                  len(grouped_images), len(images))
+    except Exception:
+        log.exception("Failed to exclude grouped gallery images")
     
-    images.sort(reverse=True)  # Newest first
-    print(f"=== END DEBUG ===\n")
-    return render_template('gallery.html', images=images)
+    images.reverse()  # Listing is sorted by name; newest first
+    return _render_template('gallery.html', images=images)
 
 
 @app.route('/gallery/image/<path:filename>')
@@ -1089,8 +1106,7 @@ def serve_gallery_image(filename: str):
 @app.route('/gallery/groups/<slug>')
 def gallery_group(slug: str):
     """Display a specific gallery group"""
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
     
     # Get group info
     group_data = db.get_gallery_group_by_slug(slug)
@@ -1102,7 +1118,7 @@ def gallery_group(slug: str):
     group_id: int = group_data.get('id', 0)
     images = db.get_group_images_with_ids(group_id)
     
-    return render_template(
+    return _render_template(
         'gallery_group.html',
         group=group_data,
         images=images
@@ -1114,28 +1130,13 @@ def gallery_group(slug: str):
 @app.route('/api/gallery', methods=['GET'])
 def api_gallery_images():
     """Get list of all gallery images"""
-    gallery_dir = Path('images/gallery')
-    if not gallery_dir.exists():
-        return jsonify({'images': []})
-    
-    images = []
-    try:
-        for item in gallery_dir.iterdir():
-            if item.is_file() and item.suffix.lower() in [
-                '.jpg', '.jpeg', '.png', '.gif', '.webp'
-            ]:
-                images.append(item.name)
-    except Exception:
-        pass
-    
-    return jsonify({'images': sorted(images)})
+    return _json_blob_response(*_current_gallery_listing()[2])
 
 
 @app.route('/api/gallery/groups', methods=['GET', 'POST'])
 def api_gallery_groups():
     """Get all gallery groups or create a new one"""
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
     
     if request.method == 'GET':
         groups = db.get_gallery_groups()
@@ -1167,8 +1168,7 @@ def api_gallery_image_groups(filename: str):
     if '..' in filename or filename.startswith('/'):
         abort(403)
 
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
 
     try:
         return jsonify({'groups': db.get_groups_for_image(filename)})
@@ -1186,8 +1186,7 @@ def api_similar(kind: str, filename: str):
     limit = max(1, min(50, int(request.args.get("limit", 10))))
     max_distance = max(0, min(64, int(request.args.get("max_distance", 12))))
 
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
 
     try:
         build_phash_index(db, kind)
@@ -1232,8 +1231,7 @@ def api_gallery_group_similar():
     max_distance = max(0, min(64, int(data.get("max_distance", 10))))
     limit = max(1, min(50, int(data.get("limit", 12))))
 
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
 
     try:
         build_phash_index(db, "image")
@@ -1276,8 +1274,7 @@ def api_gallery_group_similar():
            methods=['POST'])
 def api_add_images_to_group(group_id: int):
     """Add images to an existing group"""
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
     
     data = request.get_json()
     images = data.get('images', [])
@@ -1296,8 +1293,7 @@ def api_add_images_to_group(group_id: int):
            methods=['DELETE'])
 def api_remove_image_from_group(group_id: int, image_path: str):
     """Remove an image from a group"""
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
     
     try:
         db.remove_image_from_group(group_id, image_path)
@@ -1310,8 +1306,7 @@ def api_remove_image_from_group(group_id: int, image_path: str):
            methods=['DELETE'])
 def api_remove_image_item(group_id: int, item_id: int):
     """Remove a specific image item from a group by ID"""
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
     
     try:
         removed = db.remove_image_item_by_id(item_id, group_id)
@@ -1325,8 +1320,7 @@ def api_remove_image_item(group_id: int, item_id: int):
 @app.route('/api/gallery/groups/<int:group_id>', methods=['PUT', 'DELETE'])
 def api_modify_group(group_id: int):
     """Update or delete a gallery group"""
-    from database_migration import VideoDatabase
-    db = VideoDatabase()
+    db = get_video_database()
     
     if request.method == 'PUT':
         # Update group name or cover image
@@ -1366,7 +1360,7 @@ def playlists_hub():
             ).fetchone()
             p['item_count'] = row[0]
             
-    return render_template("playlists_hub.html", playlists=playlists)
+    return _render_template("playlists_hub.html", playlists=playlists)
 
 
 @app.route("/playlist/<int:playlist_id>")
@@ -1379,7 +1373,7 @@ def playlist_view(playlist_id):
     if not result.get("success"):
         abort(404)
         
-    return render_template("playlist_view.html", playlist=result)
+    return _render_template("playlist_view.html", playlist=result)
 
 
 # ─── BACKGROUND TASKS & STARTUP ─────────────────────────────────────
@@ -1395,6 +1389,10 @@ def startup_tasks():
             sync_thumbnails(force_regen=False)
         except Exception as e:
             print(f"⚠️  Thumbnail sync failed: {e}")
+        try:
+            get_analytics_service()  # load analytics into memory before first request
+        except Exception as e:
+            print(f"⚠️  Analytics store unavailable: {e}")
         videos = cache.get_video_list()
         print(f"📹 Found {len(videos)} videos")
         print("✅ Cache warmed and thumbnail maintenance started")
@@ -1484,24 +1482,11 @@ def save_analytics():
         return jsonify({"error": "No data provided"}), 400
     
     try:
-        # Save analytics to a JSON file (could be database in future)
-        analytics_file = Path("video_analytics.json")
-        
-        existing_data = {}
-        if analytics_file.exists():
-            try:
-                existing_data = json.loads(analytics_file.read_text(encoding="utf-8"))
-            except Exception:
-                existing_data = {}
-        
-        # Merge new data with existing
         video_id = data.get('videoId')
         if video_id:
-            existing_data[video_id] = data.get('analytics', {})
-            
-            # Write back to file
-            analytics_file.write_text(json.dumps(existing_data, indent=2), encoding="utf-8")
-            
+            # Write-through: one SQLite upsert plus an in-memory update
+            get_analytics_service().save(video_id, data.get('analytics', {}))
+
             return jsonify({"success": True, "message": "Analytics saved"})
         else:
             return jsonify({"error": "Video ID required"}), 400
@@ -1515,13 +1500,7 @@ def save_analytics():
 def get_analytics(filename):
     """Get analytics data for a specific video"""
     try:
-        analytics_file = Path("video_analytics.json")
-        
-        if not analytics_file.exists():
-            return jsonify({"analytics": None})
-        
-        analytics_data = json.loads(analytics_file.read_text(encoding="utf-8"))
-        video_analytics = analytics_data.get(filename, None)
+        video_analytics = get_analytics_service().get(filename)
         
         return jsonify({"analytics": video_analytics})
         
@@ -1534,12 +1513,7 @@ def get_analytics(filename):
 def export_analytics():
     """Export all analytics data"""
     try:
-        analytics_file = Path("video_analytics.json")
-        
-        if not analytics_file.exists():
-            return jsonify({"analytics": {}})
-        
-        analytics_data = json.loads(analytics_file.read_text(encoding="utf-8"))
+        analytics_data = get_analytics_service().get_all()
         
         # Add summary statistics
         summary = {
@@ -1559,38 +1533,8 @@ def export_analytics():
 def analytics_stats():
     """Get overall analytics statistics"""
     try:
-        analytics_file = Path("video_analytics.json")
-        
-        if not analytics_file.exists():
-            return jsonify({"stats": {"totalVideos": 0, "totalWatchTime": 0}})
-        
-        analytics_data = json.loads(analytics_file.read_text(encoding="utf-8"))
-        
-        total_videos = len(analytics_data)
-        total_watch_time = 0
-        total_views = 0
-        most_watched = None
-        highest_completion = 0
-        
-        for video_id, data in analytics_data.items():
-            total_watch_time += data.get('totalWatchTime', 0)
-            total_views += data.get('watchCount', 0)
-            
-            completion = data.get('completionPercentage', 0)
-            if completion > highest_completion:
-                highest_completion = completion
-                most_watched = video_id
-        
-        stats = {
-            "totalVideos": total_videos,
-            "totalWatchTime": round(total_watch_time / 60, 1),  # in minutes
-            "totalViews": total_views,
-            "mostWatchedVideo": most_watched,
-            "highestCompletion": round(highest_completion, 1)
-        }
-        
+        stats = get_analytics_service().stats()
         return jsonify({"stats": stats})
-        
     except Exception as e:
         return jsonify({"error": f"Failed to get stats: {str(e)}"}), 500
 
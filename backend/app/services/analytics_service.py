@@ -0,0 +1,156 @@
+"""
+Analytics Service
+Write-through store for per-video playback analytics.
+Reads are served from memory; each save is a single upsert into SQLite.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj: Any) -> str:
+    return orjson.dumps(obj).decode() if orjson is not None else json.dumps(obj)
+
+
+def _loads(s: str) -> Any:
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+
+# Pre-SQLite storage; imported once into an empty analytics table
+LEGACY_ANALYTICS_FILE = Path("video_analytics.json")
+
+# Updates the row in place rather than INSERT OR REPLACE's delete + insert
+_SQL_UPSERT = (
+    "INSERT INTO analytics (video_id, data, updated_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(video_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at"
+)
+
+
+class AnalyticsService:
+    def __init__(self, db_path: str = "data/analytics.db",
+                 legacy_file: Path = LEGACY_ANALYTICS_FILE):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analytics ("
+            "video_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at INTEGER)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(analytics)")}
+        if "updated_at" not in columns:
+            self._conn.execute("ALTER TABLE analytics ADD COLUMN updated_at INTEGER")
+        self._conn.commit()
+        self._data: Dict[str, Any] = {
+            video_id: _loads(data)
+            for video_id, data in self._conn.execute("SELECT video_id, data FROM analytics")
+        }
+        if not self._data:
+            self._import_legacy(legacy_file)
+        self._rebuild_stats()
+
+    @staticmethod
+    def _contribution(analytics: Any):
+        """(watch time, views, completion) one video adds to the totals."""
+        if not isinstance(analytics, dict):
+            return 0, 0, 0
+        return (analytics.get('totalWatchTime', 0), analytics.get('watchCount', 0),
+                analytics.get('completionPercentage', 0))
+
+    def _rebuild_stats(self) -> None:
+        """Recompute the running aggregate from scratch (startup, or when the leader drops)."""
+        self._best_completion, self._best_video = 0, None
+        if not self._data:
+            self._total_watch_time = self._total_views = 0
+            return
+        # Columnar pass: sum()/max() reduce each column in C, not per-row Python
+        watch_times, views, completions = zip(*map(self._contribution, self._data.values()))
+        self._total_watch_time = sum(watch_times)
+        self._total_views = sum(views)
+        best = max(range(len(completions)), key=completions.__getitem__)
+        if completions[best] > 0:
+            self._best_completion = completions[best]
+            self._best_video = next(islice(self._data, best, None))
+
+    def _import_legacy(self, legacy_file: Path) -> None:
+        """Carry over analytics saved by the old JSON-file implementation."""
+        try:
+            legacy = _loads(legacy_file.read_bytes())
+        except (OSError, ValueError):
+            return
+        if not isinstance(legacy, dict) or not legacy:
+            return
+        with self._lock:
+            now = int(time.time())
+            self._conn.executemany(
+                _SQL_UPSERT,
+                [(video_id, _dumps(data), now) for video_id, data in legacy.items()],
+            )
+            self._conn.commit()
+            self._data.update(legacy)
+            self._rebuild_stats()
+        print(f"[OK] Imported analytics for {len(legacy)} videos from {legacy_file}")
+
+    def save(self, video_id: str, analytics: Any) -> None:
+        """Persist one video's analytics, then update the in-memory copy."""
+        with self._lock:
+            self._conn.execute(_SQL_UPSERT, (video_id, _dumps(analytics), int(time.time())))
+            self._conn.commit()
+            old_watch_time, old_views, _ = self._contribution(self._data.get(video_id))
+            self._data[video_id] = analytics
+
+            watch_time, views, completion = self._contribution(analytics)
+            self._total_watch_time += watch_time - old_watch_time
+            self._total_views += views - old_views
+            if completion > self._best_completion:
+                self._best_completion, self._best_video = completion, video_id
+            elif video_id == self._best_video and completion < self._best_completion:
+                self._rebuild_stats()
+
+    def get(self, video_id: str) -> Optional[Any]:
+        return self._data.get(video_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Library-wide totals, maintained on every save instead of rescanned."""
+        with self._lock:
+            if not self._data:
+                return {"totalVideos": 0, "totalWatchTime": 0}
+            return {
+                "totalVideos": len(self._data),
+                "totalWatchTime": round(self._total_watch_time / 60, 1),  # in minutes
+                "totalViews": self._total_views,
+                "mostWatchedVideo": self._best_video,
+                "highestCompletion": round(self._best_completion, 1),
+            }
+
+    def get_all(self) -> Dict[str, Any]:
+        """Snapshot of every video's analytics."""
+        with self._lock:
+            return dict(self._data)
+
+
+# Singleton instance
+_analytics_service: Optional[AnalyticsService] = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics_service() -> AnalyticsService:
+    """Get or create the analytics service singleton."""
+    global _analytics_service
+    if _analytics_service is None:
+        with _analytics_lock:
+            if _analytics_service is None:
+                db_path = os.environ.get('LVS_ANALYTICS_DB_PATH', 'data/analytics.db')
+                _analytics_service = AnalyticsService(db_path)
+    return _analytics_service
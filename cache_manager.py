@@ -10,15 +10,25 @@ JSON files are backup/export artifacts only and are not used for runtime fallbac
 """
 import os
 import json
+import base64
+import hashlib
 import time
+import random
 import threading
 from collections import Counter
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, replace
 from functools import wraps
+from operator import attrgetter, itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Try to import database backend
 try:
-    from database_migration import VideoDatabase
+    from database_migration import get_video_database
     DATABASE_AVAILABLE = True
 except ImportError:
     DATABASE_AVAILABLE = False
@@ -29,8 +39,69 @@ try:
 except Exception:
     perf_monitor = None
 
+def loads_json_bytes(raw: bytes) -> Any:
+    """Parse JSON straight from bytes; undecodable UTF-8 is dropped as before."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw.decode('utf-8', errors='ignore'))
+
+
+def json_blob(payload: Any) -> Tuple[bytes, str]:
+    """Compact JSON bytes for ``payload`` plus a content ETag, for cached API responses."""
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, separators=(',', ':')).encode()
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _encode_cursor(direction: str, sort_by: str, order: str, video: Dict) -> str:
+    """Opaque listing cursor: which way to page from which (sort value, filename) key."""
+    field = VideoCache._FALLBACK_SORT_FIELDS.get(sort_by, 'added_date')
+    value = video['filename'] if field == 'filename' else (video.get(field) or 0)
+    raw = json.dumps([direction, sort_by, order, value, video['filename']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str, sort_by: str, order: str) -> Optional[Tuple[str, tuple]]:
+    """(direction, key) from a cursor, or None if it is malformed or for another sort."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, c_sort, c_order, value, filename = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if direction not in ('a', 'b') or c_sort != sort_by or c_order != order or not isinstance(filename, str):
+        return None
+    # Forged values would reach SQL parameters and key comparisons unchecked
+    if isinstance(value, bool) or not (value is None or isinstance(value, (int, float, str))):
+        return None
+    return direction, (value, filename)
+
+
+@dataclass(frozen=True, slots=True)
+class VideoMeta:
+    """Immutable per-video metadata snapshot; updates swap in a new instance."""
+    filename: str
+    added_date: float
+    rating: int
+    views: int
+    tags: Tuple[str, ...]
+
+    def as_dict(self) -> Dict[str, Any]:
+        # Plain getattr per slot; dataclasses.asdict would deep-copy every field
+        data = {field: getattr(self, field) for field in self.__slots__}
+        data['tags'] = list(self.tags)
+        return data
+
+
 class VideoCache:
     """Centralized cache manager for video metadata and file listings"""
+
+    # sort_by -> metadata key for the non-database listing path
+    _FALLBACK_SORT_FIELDS = {'rating': 'rating', 'title': 'filename', 'views': 'views'}
     
     def __init__(self, cache_ttl: int = 300, use_database: bool = True):
         self.cache_ttl = cache_ttl
@@ -41,7 +112,7 @@ class VideoCache:
         self.db = None
         if self.use_database:
             try:
-                self.db = VideoDatabase()
+                self.db = get_video_database()
                 print("[OK] Database backend initialized")
             except Exception as e:
                 raise RuntimeError(f"Database initialization failed: {e}") from e
@@ -50,11 +121,15 @@ class VideoCache:
         self._ratings: Dict[str, int] = {}
         self._views: Dict[str, int] = {}
         self._tags: Dict[str, List[str]] = {}
-        self._favorites: List[str] = []
+        # Insertion-ordered (newest first, as the DB lists them); values unused
+        self._favorites: Dict[str, None] = {}
         self._video_list: List[str] = []
-        self._video_metadata: Dict[str, Dict] = {}
+        self._video_metadata: Dict[str, VideoMeta] = {}
         self._popular_tags: List[Dict[str, Any]] = []
         self._popular_tag_cache_limit = 200
+        # Serialized API payloads: key -> (data version, body, etag)
+        self._json_blobs: Dict[Any, Tuple[Any, bytes, str]] = {}
+        self._views_version = 0
 
         # Cache timestamps
         self._last_refresh: Dict[str, float] = {
@@ -98,6 +173,9 @@ class VideoCache:
         """Load JSON file with error handling."""
         if os.path.exists(filepath):
             try:
+                if orjson is not None:
+                    with open(filepath, 'rb') as f:
+                        return orjson.loads(f.read())
                 with open(filepath, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError):
@@ -105,11 +183,15 @@ class VideoCache:
         return {}
     
     def _save_json_file(self, filepath: str, data: Dict):
-        """Save JSON file atomically."""
+        """Save JSON file atomically (orjson when available)."""
         temp_file = filepath + '.tmp'
         try:
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            if orjson is not None:
+                with open(temp_file, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2)
             if os.path.exists(filepath):
                 os.replace(temp_file, filepath)
             else:
@@ -125,11 +207,12 @@ class VideoCache:
         if not os.path.exists(sidecar_path):
             return []
         try:
-            with open(sidecar_path, 'r', encoding='utf-8', errors='ignore') as f:
-                data = json.load(f)
-                tags = data.get("tags", [])
-                if isinstance(tags, list):
-                    return [str(t).strip() for t in tags if t]
+            with open(sidecar_path, 'rb') as f:
+                raw = f.read()
+            data = loads_json_bytes(raw)
+            tags = data.get("tags", [])
+            if isinstance(tags, list):
+                return [str(t).strip() for t in tags if t]
         except Exception:
             pass
         return []
@@ -147,69 +230,106 @@ class VideoCache:
                     merged[key] = tag
         return sorted(merged.values(), key=lambda x: x.lower())
     
-    def get_ratings(self) -> Dict[str, int]:
-        """Get ratings with cache check and legacy merging."""
+    def _merge_legacy_json(self, target: Dict, filepath: str) -> None:
+        """Fill entries missing from target with values from a legacy JSON file."""
+        for filename, value in self._load_json_file(filepath).items():
+            if filename not in target:
+                target[filename] = value
+
+    def _refresh_metadata_maps(self) -> None:
+        """Rebuild ratings, views and tags from a single database pass."""
+        ratings: Dict[str, int] = {}
+        views: Dict[str, int] = {}
+        tags: Dict[str, List[str]] = {}
+        for row in self.db.get_all_videos():
+            fname = row['filename']
+            if row['rating']:
+                ratings[fname] = row['rating']
+            if row['views']:
+                views[fname] = row['views']
+            tags[fname] = self._merge_sidecar_tags(fname, row['tags'])
+        self._merge_legacy_json(ratings, self.ratings_file)
+        self._merge_legacy_json(views, self.views_file)
+
+        now = time.time()
+        self._ratings, self._views, self._tags = ratings, views, tags
+        for key in ('ratings', 'views', 'tags'):
+            self._last_refresh[key] = now
+
+    def _current_ratings(self) -> Dict[str, int]:
+        """Return the live ratings map, refreshing it when stale (caller must not mutate)."""
         with self._lock:
             was_valid = self._is_cache_valid('ratings')
             if not was_valid:
                 if self.use_database and self.db:
                     self._ratings = self.db.get_ratings_map()
-                    legacy = self._load_json_file(self.ratings_file)
-                    for filename, rating in legacy.items():
-                        if filename not in self._ratings:
-                            self._ratings[filename] = rating
+                    self._merge_legacy_json(self._ratings, self.ratings_file)
                 else:
                     self._ratings = self._load_json_file(self.ratings_file)
                 self._last_refresh['ratings'] = time.time()
-            return self._ratings.copy()
+            return self._ratings
+
+    def get_ratings(self) -> Dict[str, int]:
+        """Get ratings with cache check and legacy merging."""
+        with self._lock:
+            return self._current_ratings().copy()
     
-    def get_views(self) -> Dict[str, int]:
-        """Get views with cache check and legacy merging."""
+    def _current_views(self) -> Dict[str, int]:
+        """Return the live views map, refreshing it when stale (caller must not mutate)."""
         with self._lock:
             was_valid = self._is_cache_valid('views')
             if not was_valid:
                 if self.use_database and self.db:
                     self._views = self.db.get_views_map()
-                    legacy = self._load_json_file(self.views_file)
-                    for filename, count in legacy.items():
-                        if filename not in self._views:
-                            self._views[filename] = count
+                    self._merge_legacy_json(self._views, self.views_file)
                 else:
                     self._views = self._load_json_file(self.views_file)
                 self._last_refresh['views'] = time.time()
-            return self._views.copy()
+            return self._views
+
+    def get_views(self) -> Dict[str, int]:
+        """Get views with cache check and legacy merging."""
+        with self._lock:
+            return self._current_views().copy()
     
-    def get_tags(self) -> Dict[str, List[str]]:
-        """Get tags with cache check and dynamic sidecar merging."""
+    def _current_tags(self) -> Dict[str, List[str]]:
+        """Return the live tags map, refreshing it when stale (caller must not mutate)."""
         with self._lock:
             was_valid = self._is_cache_valid('tags')
             if not was_valid:
                 if self.use_database and self.db:
                     db_tags_map = self.db.get_tags_map()
                     self._tags = {}
-                    all_filenames = self.db.get_all_filenames()
-                    for fname in all_filenames:
+                    for fname in self.db.get_all_filenames_set():
                         self._tags[fname] = self._merge_sidecar_tags(fname, db_tags_map.get(fname, []))
                 else:
                     self._tags = self._load_json_file(self.tags_file)
                 self._last_refresh['tags'] = time.time()
-            return self._tags.copy()
+            return self._tags
+
+    def get_tags(self) -> Dict[str, List[str]]:
+        """Get tags with cache check and dynamic sidecar merging."""
+        with self._lock:
+            return self._current_tags().copy()
     
+    def _current_favorites(self) -> Dict[str, None]:
+        """Live favorites, newest first, refreshed when stale; caller holds the lock and must not mutate it."""
+        if not self._is_cache_valid('favorites'):
+            if self.use_database and self.db:
+                db_favs = self.db.get_favorites()
+                legacy_data = self._load_json_file(self.favorites_file)
+                legacy_favs = legacy_data.get("favorites", [])
+                self._favorites = dict.fromkeys([*db_favs, *legacy_favs])
+            else:
+                data = self._load_json_file(self.favorites_file)
+                self._favorites = dict.fromkeys(data.get("favorites", []))
+            self._last_refresh['favorites'] = time.time()
+        return self._favorites
+
     def get_favorites(self) -> List[str]:
         """Get favorites with cache check and legacy merging."""
         with self._lock:
-            was_valid = self._is_cache_valid('favorites')
-            if not was_valid:
-                if self.use_database and self.db:
-                    db_favs = self.db.get_favorites()
-                    legacy_data = self._load_json_file(self.favorites_file)
-                    legacy_favs = legacy_data.get("favorites", [])
-                    self._favorites = list(set(db_favs) | set(legacy_favs))
-                else:
-                    data = self._load_json_file(self.favorites_file)
-                    self._favorites = data.get("favorites", [])
-                self._last_refresh['favorites'] = time.time()
-            return self._favorites.copy()
+            return list(self._current_favorites())
     
     def _scan_video_directory(self) -> List[str]:
         """Scan the filesystem for video files."""
@@ -221,8 +341,8 @@ class VideoCache:
             if video.lower().endswith(allowed_extensions)
         ]
     
-    def get_video_list(self) -> List[str]:
-        """Get video list with cache check and improved file detection"""
+    def _current_video_list(self) -> List[str]:
+        """Return the live video list, refreshing it when stale (caller must not mutate)."""
         with self._lock:
             was_valid = self._is_cache_valid('video_list')
             if not was_valid:
@@ -238,29 +358,47 @@ class VideoCache:
                 
                 self._video_list = current_videos
                 self._last_refresh['video_list'] = time.time()
-            return self._video_list.copy()
+            return self._video_list
+
+    def get_video_list(self) -> List[str]:
+        """Get video list with cache check and improved file detection"""
+        with self._lock:
+            return self._current_video_list().copy()
+
+    def get_random_video(self) -> Optional[str]:
+        """Pick one cached video without copying the whole list."""
+        with self._lock:
+            videos = self._current_video_list()
+            return random.choice(videos) if videos else None
     
-    def get_video_metadata(self, video_filename: str) -> Optional[Dict]:
-        """Get cached video metadata or compute it"""
+    def get_video_metadata(self, video_filename: str) -> Optional[VideoMeta]:
+        """Get cached video metadata or compute it (immutable, safe to share)"""
         with self._lock:
-            if video_filename not in self._video_metadata:
+            meta = self._video_metadata.get(video_filename)
+            if meta is None:
                 video_path = os.path.join(self.video_dir, video_filename)
-                if os.path.exists(video_path):
-                    try:
-                        added_date = os.path.getctime(video_path)
-                    except OSError:
-                        added_date = 0
-                    
-                    self._video_metadata[video_filename] = {
-                        'filename': video_filename,
-                        'added_date': added_date,
-                        'rating': self.get_ratings().get(video_filename, 0),
-                        'views': self.get_views().get(video_filename, 0),
-                        'tags': self.get_tags().get(video_filename, [])
-                    }
-                else:
+                if not os.path.exists(video_path):
                     return None
-            return self._video_metadata[video_filename].copy()
+                try:
+                    added_date = os.path.getctime(video_path)
+                except OSError:
+                    added_date = 0
+
+                meta = VideoMeta(
+                    filename=video_filename,
+                    added_date=added_date,
+                    rating=self._current_ratings().get(video_filename, 0),
+                    views=self._current_views().get(video_filename, 0),
+                    tags=tuple(self._current_tags().get(video_filename, ())),
+                )
+                self._video_metadata[video_filename] = meta
+            return meta
+
+    def _replace_metadata(self, filename: str, **changes) -> None:
+        """Swap in an updated metadata snapshot if one is cached."""
+        meta = self._video_metadata.get(filename)
+        if meta is not None:
+            self._video_metadata[filename] = replace(meta, **changes)
 
     def get(self, key: str, force_refresh: bool = False):
         """Generic getter to support legacy cache.get(...) usage."""
@@ -297,10 +435,10 @@ class VideoCache:
             if self.use_database and self.db:
                 self.db.update_rating(filename, rating)
                 self._ratings[filename] = rating
-                self._video_metadata.pop(filename, None)
             else:
                 self._ratings[filename] = rating
                 self._save_json_file(self.ratings_file, self._ratings)
+            self._replace_metadata(filename, rating=rating)
             
     def update_view(self, filename: str):
         """Increment view count with write-through cache"""
@@ -308,11 +446,12 @@ class VideoCache:
             if self.use_database and self.db:
                 new_count = self.db.increment_view_count(filename)
                 self._views[filename] = new_count
-                self._video_metadata.pop(filename, None)
             else:
-                new_count = self.get_views().get(filename, 0) + 1
+                new_count = self._current_views().get(filename, 0) + 1
                 self._views[filename] = new_count
                 self._save_json_file(self.views_file, self._views)
+            self._views_version += 1
+            self._replace_metadata(filename, views=new_count)
             return new_count
     
     def update_tags(self, filename: str, tags: List[str]):
@@ -327,15 +466,57 @@ class VideoCache:
             
             if self.use_database and self.db:
                 existing_tags = self.db.get_video_tags(filename)
-                for tag in existing_tags: self.db.remove_tag(filename, tag)
-                for tag in normalized: self.db.add_tag(filename, tag)
+                with self.db.batch():
+                    for tag in existing_tags: self.db.remove_tag(filename, tag)
+                    for tag in normalized: self.db.add_tag(filename, tag)
                 self._tags[filename] = self._merge_sidecar_tags(filename, normalized)
-                self._video_metadata.pop(filename, None)
             else:
                 self._tags[filename] = normalized
                 self._save_json_file(self.tags_file, self._tags)
+            self._replace_metadata(filename, tags=tuple(self._tags[filename]))
             self.invalidate_popular_tags()
     
+    def add_tag(self, filename: str, tag: str) -> List[str]:
+        """Add one tag unless the video has it (any case); returns the video's tags."""
+        with self._lock:
+            current = self._current_tags().get(filename, [])
+            key = tag.lower()
+            if any(t.lower() == key for t in current):
+                return list(current)
+            if self.use_database and self.db:
+                self.db.add_tag(filename, tag)
+                self._tags[filename] = self._merge_sidecar_tags(filename, current + [tag])
+            else:
+                self._tags[filename] = current + [tag]
+                self._save_json_file(self.tags_file, self._tags)
+            self._replace_metadata(filename, tags=tuple(self._tags[filename]))
+            self.invalidate_popular_tags()
+            return list(self._tags[filename])
+
+    def remove_tag(self, filename: str, tag: str) -> Optional[List[str]]:
+        """Drop one tag (any case); None when the video has no tags at all."""
+        with self._lock:
+            current = self._current_tags().get(filename, [])
+            if not current:
+                return None
+            key = tag.lower()
+            remaining = [t for t in current if t.lower() != key]
+            if len(remaining) == len(current):
+                return list(current)
+            if self.use_database and self.db:
+                # Stored rows may lack the '#' the cached labels carry
+                doomed = [stored for stored in self.db.get_video_tags(filename)
+                          if ('#' + stored.strip().lstrip('#')).lower() == key]
+                with self.db.batch():
+                    for stored in doomed: self.db.remove_tag(filename, stored)
+                self._tags[filename] = self._merge_sidecar_tags(filename, remaining)
+            else:
+                self._tags[filename] = remaining
+                self._save_json_file(self.tags_file, self._tags)
+            self._replace_metadata(filename, tags=tuple(self._tags[filename]))
+            self.invalidate_popular_tags()
+            return list(self._tags[filename])
+
     def update_favorites(self, favorites: List[str]):
         """Update favorites with full state synchronization."""
         with self._lock:
@@ -344,16 +525,32 @@ class VideoCache:
                 new_favs = set(favorites)
                 for fav in (new_favs - current_db_favs): self.db.set_favorite(fav, True)
                 for fav in (current_db_favs - new_favs): self.db.set_favorite(fav, False)
-                self._favorites = list(new_favs)
+            self._favorites = dict.fromkeys(favorites)
+            if not (self.use_database and self.db):
+                self._save_json_file(self.favorites_file, {"favorites": list(self._favorites)})
+
+    def toggle_favorite(self, filename: str) -> List[str]:
+        """Flip one video's favorite status under the cache lock; returns the new favorites."""
+        with self._lock:
+            favorites = self._current_favorites()
+            is_favorite = filename not in favorites
+            if self.use_database and self.db:
+                self.db.set_favorite(filename, is_favorite)
+            if is_favorite:
+                favorites = self._favorites = {filename: None, **favorites}
             else:
-                self._favorites = favorites
-                self._save_json_file(self.favorites_file, {"favorites": self._favorites})
+                favorites.pop(filename, None)
+            if not (self.use_database and self.db):
+                self._save_json_file(self.favorites_file, {"favorites": list(favorites)})
+            return list(favorites)
     
     def refresh_all(self):
         """Force refresh all cache entries"""
         with self._lock:
             self._last_refresh = {key: 0 for key in self._last_refresh}
             self._video_metadata.clear()
+            if self.use_database and self.db:
+                self._refresh_metadata_maps()
             self.get_ratings(); self.get_views(); self.get_tags(); self.get_popular_tags(); self.get_favorites(); self.get_video_list()
     
     def invalidate_ratings(self):
@@ -405,8 +602,7 @@ class VideoCache:
         if not (self.use_database and self.db): return
         video_list = self._scan_video_directory()
         try:
-            db_videos = self.db.get_all_videos()
-            existing_videos = {v['filename'] for v in db_videos}
+            existing_videos = self.db.get_all_filenames_set()
         except Exception: return
         
         new_videos = set(video_list) - existing_videos
@@ -433,22 +629,115 @@ class VideoCache:
             return self._filter_existing(self.db.get_all_videos(sort_by, order, limit=limit, offset=offset))
         else:
             videos = self.get_video_list()
-            video_data = [self.get_video_metadata(v) for v in videos if self.get_video_metadata(v)]
-            if sort_by == 'rating': video_data.sort(key=lambda x: x['rating'], reverse=reverse)
-            elif sort_by == 'title': video_data.sort(key=lambda x: x['filename'], reverse=reverse)
-            elif sort_by == 'views': video_data.sort(key=lambda x: x['views'], reverse=reverse)
-            else: video_data.sort(key=lambda x: x['added_date'], reverse=reverse)
-            if limit is not None: return video_data[offset:offset + max(1, limit)]
-            return video_data
+            metas = [meta for meta in map(self.get_video_metadata, videos) if meta]
+            sort_field = self._FALLBACK_SORT_FIELDS.get(sort_by, 'added_date')
+            metas.sort(key=attrgetter(sort_field), reverse=reverse)
+            if limit is not None: metas = metas[offset:offset + max(1, limit)]
+            return [meta.as_dict() for meta in metas]
         
+    def get_video_page(self, sort_by: str = 'date', reverse: bool = True, per_page: int = 60,
+                       cursor: Optional[str] = None, offset: int = 0) -> Tuple[List[Dict], Optional[str], Optional[str]]:
+        """One listing page plus (next, prev) cursors for its neighbours.
+
+        With a cursor the page is a keyset seek, so deep pages cost the same
+        as the first; without one ``offset`` selects the page. Ordering is
+        (sort value, filename), identical on both paths.
+        """
+        order = 'desc' if reverse else 'asc'
+        per_page = max(1, per_page)
+        decoded = _decode_cursor(cursor, sort_by, order) if cursor else None
+        direction, key = decoded if decoded else ('a', None)
+        offset = 0 if key is not None else max(0, offset)
+
+        # One extra row tells whether another page lies beyond this one
+        if self.use_database and self.db:
+            self._ensure_videos_in_database()
+            rows = self.db.get_videos_page(
+                sort_by, order, limit=per_page + 1, offset=offset,
+                after=key if direction == 'a' else None,
+                before=key if direction == 'b' else None,
+            )
+        else:
+            field = self._FALLBACK_SORT_FIELDS.get(sort_by, 'added_date')
+            sort_key = (lambda v: (v['filename'], v['filename'])) if field == 'filename' \
+                else (lambda v: (v[field] or 0, v['filename']))
+            metas = [meta for meta in map(self.get_video_metadata, self.get_video_list()) if meta]
+            videos = sorted((meta.as_dict() for meta in metas), key=sort_key, reverse=reverse)
+            if key is not None:
+                if direction == 'a':
+                    videos = [v for v in videos if (sort_key(v) < key) == reverse and sort_key(v) != key]
+                else:
+                    videos = [v for v in videos if (sort_key(v) > key) == reverse and sort_key(v) != key]
+                    videos = videos[-(per_page + 1):]
+            rows = videos if direction == 'b' and key is not None else videos[offset:offset + per_page + 1]
+
+        if direction == 'b' and key is not None:
+            more_before, more_after = len(rows) > per_page, True
+            rows = rows[-per_page:]
+        else:
+            more_before, more_after = key is not None or offset > 0, len(rows) > per_page
+            rows = rows[:per_page]
+
+        next_cursor = _encode_cursor('a', sort_by, order, rows[-1]) if rows and more_after else None
+        prev_cursor = _encode_cursor('b', sort_by, order, rows[0]) if rows and more_before else None
+        return self._filter_existing(rows), next_cursor, prev_cursor
+
+    def get_videos_by_filenames(self, filenames: List[str], sort_by: str = 'date', reverse: bool = True) -> List[Dict]:
+        """Video data for just these filenames, fetched in bulk and sorted like get_all_video_data"""
+        sort_field = self._FALLBACK_SORT_FIELDS.get(sort_by, 'added_date')
+        if self.use_database and self.db:
+            self._ensure_videos_in_database()
+            videos = self._filter_existing(self.db.get_videos_by_filenames(filenames))
+            if sort_by == 'filename' or sort_field == 'filename':
+                videos.sort(key=itemgetter('filename'), reverse=reverse)
+            else:
+                # Newest first within ties, as the SQL listing orders them
+                videos.sort(key=lambda v: v['added_date'] or 0, reverse=True)
+                videos.sort(key=lambda v: v[sort_field] or 0, reverse=reverse)
+            return videos
+        metas = [meta for meta in map(self.get_video_metadata, filenames) if meta]
+        metas.sort(key=attrgetter(sort_field), reverse=reverse)
+        return [meta.as_dict() for meta in metas]
+
+    def get_videos_min_rating(self, min_rating: float, sort_by: str = 'rating', reverse: bool = True) -> List[Dict]:
+        """Videos rated at least ``min_rating``, filtered and sorted in SQL when available"""
+        if self.use_database and self.db:
+            self._ensure_videos_in_database()
+            order = 'desc' if reverse else 'asc'
+            return self._filter_existing(self.db.get_all_videos(sort_by, order, min_rating=min_rating))
+        return [v for v in self.get_all_video_data(sort_by, reverse) if (v.get('rating') or 0) >= min_rating]
+
     def get_videos_by_tag_optimized(self, tag: str) -> List[Dict]:
         if self.use_database and self.db: return self._filter_existing(self.db.get_videos_by_tag(tag))
         raise RuntimeError("Runtime DB backend unavailable")
     
-    def get_related_videos_optimized(self, filename: str, limit: int = 20) -> List[Dict]:
-        if self.use_database and self.db: return self._filter_existing(self.db.get_related_videos(filename, limit))
+    def get_related_videos_optimized(self, filename: str, offset: int = 0, limit: int = 20) -> Tuple[List[Dict], int]:
+        """One page of related videos plus the total number of related videos."""
+        if self.use_database and self.db:
+            items = self._filter_existing(self.db.get_related_videos(filename, limit, offset))
+            return items, self.db.count_related_videos(filename)
         raise RuntimeError("Runtime DB backend unavailable")
     
+    def get_watch_page_data(self, filename: str, offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """Everything the watch page needs for one video, read under a single lock
+        without copying the library-wide ratings/views/tags/favorites maps.
+
+        ``favorites`` lists only the favorited videos among this one and its
+        related page, which is all the page's favorite buttons look up.
+        """
+        related, related_total = self.get_related_videos_optimized(filename, offset=offset, limit=limit)
+        with self._lock:
+            favorites = self._current_favorites()
+            on_page = [filename, *(video['filename'] for video in related)]
+            return {
+                'rating': self._current_ratings().get(filename, 0),
+                'views': self._current_views().get(filename, 0),
+                'tags': list(self._current_tags().get(filename, ())),
+                'favorites': [name for name in on_page if name in favorites],
+                'related': related,
+                'related_total': related_total,
+            }
+
     def get_all_unique_tags(self) -> List[str]:
         if self.use_database and self.db: return self.db.get_all_tags()
         raise RuntimeError("Runtime DB backend unavailable")
@@ -462,6 +751,29 @@ class VideoCache:
                 self._last_refresh['popular_tags'] = time.time()
             return self._popular_tags[:limit]
 
+    def _cached_json(self, key: Any, version: Any, payload) -> Tuple[bytes, str]:
+        """Serialized payload for ``key``; rebuilt only when ``version`` moves on."""
+        cached = self._json_blobs.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, *json_blob(payload()))
+            self._json_blobs[key] = cached
+        return cached[1], cached[2]
+
+    def views_json(self) -> Tuple[bytes, str]:
+        """(body, etag) of the views map, re-serialized only after views change."""
+        with self._lock:
+            views = self._current_views()
+            # A reload moves last_refresh; a write-through increment bumps the counter
+            version = (self._last_refresh['views'], self._views_version)
+            return self._cached_json('views', version, lambda: views)
+
+    def popular_tags_json(self, limit: int = 50) -> Tuple[bytes, str]:
+        """(body, etag) of the popular-tags payload for ``limit``."""
+        with self._lock:
+            tags = self.get_popular_tags(limit)
+            return self._cached_json(('popular_tags', limit), self._last_refresh['popular_tags'],
+                                     lambda: {"tags": tags})
+
 # Global cache instance
 cache = VideoCache()
 
@@ -4,11 +4,19 @@ Supports environment variables, .env files, and JSON config with validation
 """
 
 import os
+import re
 import json
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 from pathlib import Path
 
+# Static lookup data for ConfigManager._parse_env_value
+_BOOL_VALUES = {
+    'true': True, 'yes': True, '1': True, 'on': True,
+    'false': False, 'no': False, '0': False, 'off': False,
+}
+_NUMBER_RE = re.compile(r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)')
+
 
 @dataclass
 class ServerConfig:
@@ -35,6 +43,11 @@ class ServerConfig:
     max_cache_size: int = 1000
     enable_thumbnails: bool = True
     thumbnail_quality: int = 85
+    # Hand full-file video responses to a front server via X-Sendfile
+    use_x_sendfile: bool = False
+    # nginx internal location for videos (e.g. "/_protected_videos/"); when set,
+    # /video responses are X-Accel-Redirects and nginx serves the bytes
+    x_accel_redirect_prefix: str = ""
 
     # Monitoring settings
     enable_analytics: bool = True
@@ -44,6 +57,8 @@ class ServerConfig:
 
     # Security settings
     enable_cors: bool = False
+    # Request bodies (JSON POSTs) larger than this get 413 before parsing
+    max_request_body: int = 1024 * 1024  # 1MB
     allowed_origins: list = field(default_factory=list)
 
     # Feature flags
@@ -67,7 +82,12 @@ class ServerConfig:
         if self.log_level not in ['DEBUG', 'INFO', 'WARNING', 'ERROR']:
             raise ValueError(f"Invalid log level: {self.log_level}")
 
-        # Ensure directories exist
+        if self.max_request_body < 1:
+            raise ValueError(
+                f"Invalid max request body: {self.max_request_body}. Must be at least 1 byte")
+
+    def ensure_dirs(self):
+        """Create the video and thumbnail directories if missing"""
         Path(self.video_directory).mkdir(exist_ok=True)
         Path(self.thumbnail_directory).mkdir(parents=True, exist_ok=True)
 
@@ -106,9 +126,12 @@ class ConfigManager:
         if _db_path_alias is not None:
             config_data.setdefault("metadata_db", _db_path_alias)
 
-        # Create config object with validation
+        # Create config object with validation; directories are created once here
+        # rather than on every ServerConfig construction.
         try:
-            self._config = ServerConfig(**config_data)
+            config = ServerConfig(**config_data)
+            config.ensure_dirs()
+            self._config = config
             print("[OK] Configuration loaded successfully")
             return self._config
         except (TypeError, ValueError, OSError) as e:
@@ -116,6 +139,7 @@ class ConfigManager:
             print(f"[ERROR] Configuration error: {e}")
             print("Using default configuration...")
             self._config = ServerConfig()
+            self._config.ensure_dirs()
             return self._config
 
     def _load_json_config(self) -> Dict[str, Any]:
@@ -175,19 +199,13 @@ class ConfigManager:
         value = value.strip().strip('"\'')
 
         # Boolean values
-        if value.lower() in ('true', 'yes', '1', 'on'):
-            return True
-        elif value.lower() in ('false', 'no', '0', 'off'):
-            return False
+        flag = _BOOL_VALUES.get(value.lower())
+        if flag is not None:
+            return flag
 
         # Numeric values
-        try:
-            if '.' in value:
-                return float(value)
-            else:
-                return int(value)
-        except ValueError:
-            pass
+        if _NUMBER_RE.fullmatch(value):
+            return float(value) if '.' in value else int(value)
 
         # List values (comma-separated)
         if ',' in value:
@@ -213,11 +231,14 @@ class ConfigManager:
                 'max_cache_size': config.max_cache_size,
                 'enable_thumbnails': config.enable_thumbnails,
                 'thumbnail_quality': config.thumbnail_quality,
+                'use_x_sendfile': config.use_x_sendfile,
+                'x_accel_redirect_prefix': config.x_accel_redirect_prefix,
                 'enable_analytics': config.enable_analytics,
                 'enable_perf_log': config.enable_perf_log,
                 'log_level': config.log_level,
                 'max_log_size': config.max_log_size,
                 'enable_cors': config.enable_cors,
+                'max_request_body': config.max_request_body,
                 'allowed_origins': config.allowed_origins,
                 'feature_vr_simplify': config.feature_vr_simplify,
                 'feature_previews': config.feature_previews
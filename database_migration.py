@@ -5,13 +5,71 @@ Migrates JSON files to SQLite for better performance with larger datasets
 import sqlite3
 import json
 import os
+import queue
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set
 import threading
+import time
 from contextlib import contextmanager
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# JSON inputs at least this large are parsed incrementally when ijson is installed
+JSON_STREAM_THRESHOLD = 1024 * 1024
+
+
+def _iter_json_object(filepath: str):
+    """Yield (key, value) pairs of a top-level JSON object; empty if missing or invalid."""
+    if not os.path.exists(filepath):
+        return
+    if ijson is not None and os.path.getsize(filepath) >= JSON_STREAM_THRESHOLD:
+        try:
+            with open(filepath, 'rb') as f:
+                yield from ijson.kvitems(f, '', use_float=True)
+        except ijson.JSONError as e:
+            print(f"[WARN] Stopped reading {filepath}: {e}")
+        return
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return
+    if isinstance(data, dict):
+        yield from data.items()
+
+
+def _video_from_row(row) -> Dict:
+    """Build a video dict from a (filename, added_date, file_size, rating,
+    views, tags, is_favorite) row; positional unpacking skips Row name lookups."""
+    filename, added_date, file_size, rating, views, tags, is_favorite = row
+    return {
+        'filename': filename,
+        'added_date': added_date,
+        'file_size': file_size,
+        'rating': rating,
+        'views': views,
+        'tags': json.loads(tags),
+        'is_favorite': bool(is_favorite)
+    }
+
+
 class VideoDatabase:
     """SQLite database manager for video metadata"""
+
+    # WAL model: at most POOL_SIZE concurrent readers, each on a reused
+    # connection (a semaphore bounds checkouts), plus one long-lived writer
+    # connection serialised by self._lock.
+    POOL_SIZE = 8
+    # Seconds to wait for a free reader before giving up
+    READER_TIMEOUT = 30.0
+    # Seconds between planner-statistics refreshes on the writer
+    OPTIMIZE_INTERVAL = 6 * 3600
+
+    # Lower-case suffixes of files treated as videos on disk
+    VIDEO_EXTENSIONS = ('.mp4', '.webm', '.ogg')
     
     def __init__(self, db_path: Optional[str] = None):
         # Honor explicit path; otherwise match docker-compose / DEPLOYMENT: LVS_DB_PATH.
@@ -20,21 +78,209 @@ class VideoDatabase:
         )
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         self._lock = threading.RLock()
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=self.POOL_SIZE)
+        self._readers = threading.BoundedSemaphore(self.POOL_SIZE)
+        self._writer: Optional[sqlite3.Connection] = None
+        # Filenames known to have a videos row; loaded lazily under self._lock
+        self._known_filenames: Optional[set] = None
+        # Nesting depth of batch() blocks; commits are deferred while > 0
+        self._batch_depth = 0
+        self._last_optimize = 0.0
         self.init_database()
+
+    # Per-connection tuning; journal_mode=WAL is persistent and is set once
+    # in init_database.
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",     # WAL-safe; fsync on checkpoint only
+        "PRAGMA cache_size=-64000",      # ~64MB page cache
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",    # 256MB memory-mapped I/O
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA analysis_limit=400",     # bound ANALYZE work done by optimize
+    )
+
+    # Hot-path statements, shared as constants so each connection's
+    # statement cache reuses the prepared form.
+    _SQL_GET_VIDEO = """
+        SELECT 
+            v.filename,
+            v.added_date,
+            v.file_size,
+            v.rating,
+            v.view_count as views,
+            (SELECT json_group_array(t.tag) FROM video_tags t
+             WHERE t.filename = v.filename) as tags,
+            v.is_favorite
+        FROM videos v
+        WHERE v.filename = ?
+    """
+    # Same columns for many filenames; format() in the placeholders
+    _SQL_GET_VIDEOS_IN = _SQL_GET_VIDEO.replace("WHERE v.filename = ?", "WHERE v.filename IN ({})")
+    _SQL_ENSURE_VIDEO = "INSERT OR IGNORE INTO videos (filename) VALUES (?)"
+    _SQL_UPSERT_RATING = "INSERT OR REPLACE INTO ratings (filename, rating) VALUES (?, ?)"
+    # RETURNING needs SQLite 3.35+
+    _SQL_INCR_VIEW = """
+        INSERT INTO views (filename, view_count, last_viewed)
+        VALUES (?, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT(filename) DO UPDATE SET
+            view_count = view_count + 1,
+            last_viewed = CURRENT_TIMESTAMP
+        RETURNING view_count
+    """
+    _SQL_ADD_TAG = "INSERT OR IGNORE INTO video_tags (filename, tag) VALUES (?, ?)"
+    _SQL_REMOVE_TAG = "DELETE FROM video_tags WHERE filename = ? AND tag = ?"
+    _SQL_GET_VIDEO_TAGS = "SELECT tag FROM video_tags WHERE filename = ? ORDER BY tag"
+    _SQL_IS_FAVORITE = "SELECT filename FROM favorites WHERE filename = ?"
+    _SQL_ADD_FAVORITE = "INSERT OR IGNORE INTO favorites (filename) VALUES (?)"
+    _SQL_DELETE_FAVORITE = "DELETE FROM favorites WHERE filename = ?"
+    _SQL_MIGRATE_VIDEO = """
+        INSERT OR REPLACE INTO videos (filename, added_date, file_size)
+        VALUES (?, ?, ?)
+    """
+
+    # Rows per executemany/commit while migrating streamed JSON input
+    MIGRATION_BATCH_SIZE = 10000
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a new SQLite handle usable from any pool thread."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
     
     @contextmanager
-    def get_connection(self):
-        """Get database connection with automatic cleanup"""
-        conn = sqlite3.connect(self.db_path, timeout=30.0)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access
+    def get_reader(self):
+        """Check out a pooled read connection, returning it on exit"""
+        if not self._readers.acquire(timeout=self.READER_TIMEOUT):
+            raise sqlite3.OperationalError("timed out waiting for a reader connection")
         try:
-            yield conn
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                # Pool fills lazily; the semaphore caps it at POOL_SIZE
+                conn = self._open_connection()
+            try:
+                yield conn
+            finally:
+                # Never hand an open transaction to the next caller.
+                if conn.in_transaction:
+                    conn.rollback()
+                self._pool.put_nowait(conn)
         finally:
+            self._readers.release()
+
+    @contextmanager
+    def get_writer(self):
+        """Hold the single long-lived write connection for the duration of the block"""
+        with self._lock:
+            if self._writer is None:
+                self._writer = self._open_connection()
+            elif (not self._batch_depth
+                  and time.time() - self._last_optimize > self.OPTIMIZE_INTERVAL):
+                self.optimize()
+            try:
+                yield self._writer
+            finally:
+                # Inside batch() the open transaction belongs to the batch
+                if self._writer.in_transaction and not self._batch_depth:
+                    self._writer.rollback()
+                    # Rows added during the aborted write may not exist
+                    self._known_filenames = None
+
+    def _commit(self, conn: sqlite3.Connection) -> None:
+        """Commit unless a batch() block will commit on exit"""
+        if not self._batch_depth:
+            conn.commit()
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several mutator calls into one transaction.
+        
+        Usage:
+            with db.batch():
+                db.add_tag(...)
+                db.update_rating(...)
+        
+        Other writers wait until the block exits; an exception rolls back
+        everything written inside it.
+        """
+        with self.get_writer() as conn:
+            if not self._batch_depth and not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    conn.rollback()
+                    self._known_filenames = None
+                raise
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                conn.commit()
+
+    def _ensure_video_row(self, conn: sqlite3.Connection, filename: str) -> None:
+        """Insert a bare videos row unless filename is already known (writer only)"""
+        if self._known_filenames is None:
+            self._known_filenames = {
+                row[0] for row in conn.execute("SELECT filename FROM videos")
+            }
+        if filename not in self._known_filenames:
+            conn.execute(self._SQL_ENSURE_VIDEO, (filename,))
+            self._known_filenames.add(filename)
+
+    @contextmanager
+    def get_connection(self):
+        """Writer access for callers outside this class issuing raw SQL"""
+        with self.get_writer() as conn:
+            try:
+                yield conn
+            finally:
+                # Raw SQL may have added or deleted videos rows
+                self._known_filenames = None
+
+    def optimize(self, full: bool = False) -> None:
+        """Refresh planner statistics; full=True runs a complete ANALYZE"""
+        with self._lock:
+            if self._writer is None:
+                self._writer = self._open_connection()
+            try:
+                # 0x10002: analyze any table whose stats look stale, even if
+                # this connection never queried it
+                self._writer.execute("ANALYZE" if full else "PRAGMA optimize=0x10002")
+                if self._writer.in_transaction:
+                    self._writer.commit()
+            except sqlite3.Error as e:
+                print(f"[WARN] SQLite optimize failed: {e}")
+            self._last_optimize = time.time()
+
+    def close(self) -> None:
+        """Close the writer and all idle pooled read connections."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                # Let each reader feed back stats for the queries it ran
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
             conn.close()
     
     def init_database(self):
         """Initialize database schema"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
+            # WAL lets readers proceed while a write is in progress
+            conn.execute("PRAGMA journal_mode=WAL")
             # Create tables
             conn.executescript("""
                 -- Videos table
@@ -44,7 +290,11 @@ class VideoDatabase:
                     file_size INTEGER,
                     duration REAL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    -- Denormalized from ratings/views/favorites by triggers
+                    rating INTEGER NOT NULL DEFAULT 0,
+                    view_count INTEGER NOT NULL DEFAULT 0,
+                    is_favorite INTEGER NOT NULL DEFAULT 0
                 );
                 
                 -- Ratings table  
@@ -107,8 +357,13 @@ class VideoDatabase:
                 CREATE INDEX IF NOT EXISTS idx_ratings_rating ON ratings(rating);
                 CREATE INDEX IF NOT EXISTS idx_views_count ON views(view_count);
                 CREATE INDEX IF NOT EXISTS idx_views_last_viewed ON views(last_viewed);
-                CREATE INDEX IF NOT EXISTS idx_tags_tag ON video_tags(tag);
+                -- (tag, filename) covers tag -> filename probes such as the
+                -- related-videos self-join; it supersedes the old tag-only index.
+                CREATE INDEX IF NOT EXISTS idx_tags_tag_filename ON video_tags(tag, filename);
+                DROP INDEX IF EXISTS idx_tags_tag;
                 CREATE INDEX IF NOT EXISTS idx_tags_filename ON video_tags(filename);
+                -- Covering, case-insensitive index for exact tag lookups
+                CREATE INDEX IF NOT EXISTS idx_tags_tag_nocase ON video_tags(tag COLLATE NOCASE, filename);
                 
                 -- Update triggers
                 CREATE TRIGGER IF NOT EXISTS update_videos_timestamp 
@@ -175,7 +430,82 @@ class VideoDatabase:
                         UPDATE phash_cache SET updated_at = CURRENT_TIMESTAMP WHERE filename = NEW.filename AND kind = NEW.kind;
                     END;
             """)
-            conn.commit()
+            self._ensure_denormalized_columns(conn)
+            self._commit(conn)
+            self.optimize()
+    
+    # Per-video columns on videos mirrored from their source tables
+    _DENORMALIZED_COLUMNS = {
+        'rating': "COALESCE((SELECT rating FROM ratings WHERE filename = {f}), 0)",
+        'view_count': "COALESCE((SELECT view_count FROM views WHERE filename = {f}), 0)",
+        'is_favorite': "EXISTS (SELECT 1 FROM favorites WHERE filename = {f})",
+    }
+    
+    def _ensure_denormalized_columns(self, conn: sqlite3.Connection) -> None:
+        """Add/backfill videos.rating, view_count, is_favorite and the triggers that sync them"""
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(videos)")}
+        missing = [col for col in self._DENORMALIZED_COLUMNS if col not in existing]
+        for col in missing:
+            conn.execute(f"ALTER TABLE videos ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0")
+        if missing:
+            assignments = ", ".join(
+                f"{col} = {expr.format(f='videos.filename')}"
+                for col, expr in self._DENORMALIZED_COLUMNS.items()
+            )
+            conn.execute(f"UPDATE videos SET {assignments}")
+        
+        # Source tables stay authoritative; triggers copy changes onto videos.
+        # INSERT OR REPLACE on a source table fires only the INSERT trigger,
+        # and a (re)inserted videos row pulls its current values.
+        conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS videos_pull_denormalized
+                AFTER INSERT ON videos
+                BEGIN
+                    UPDATE videos SET
+                        rating = COALESCE((SELECT rating FROM ratings WHERE filename = NEW.filename), 0),
+                        view_count = COALESCE((SELECT view_count FROM views WHERE filename = NEW.filename), 0),
+                        is_favorite = EXISTS (SELECT 1 FROM favorites WHERE filename = NEW.filename)
+                    WHERE filename = NEW.filename;
+                END;
+            
+            CREATE TRIGGER IF NOT EXISTS ratings_push_insert AFTER INSERT ON ratings
+                BEGIN UPDATE videos SET rating = COALESCE(NEW.rating, 0) WHERE filename = NEW.filename; END;
+            CREATE TRIGGER IF NOT EXISTS ratings_push_update AFTER UPDATE OF rating ON ratings
+                BEGIN UPDATE videos SET rating = COALESCE(NEW.rating, 0) WHERE filename = NEW.filename; END;
+            CREATE TRIGGER IF NOT EXISTS ratings_push_delete AFTER DELETE ON ratings
+                BEGIN UPDATE videos SET rating = 0 WHERE filename = OLD.filename; END;
+            
+            CREATE TRIGGER IF NOT EXISTS views_push_insert AFTER INSERT ON views
+                BEGIN UPDATE videos SET view_count = COALESCE(NEW.view_count, 0) WHERE filename = NEW.filename; END;
+            CREATE TRIGGER IF NOT EXISTS views_push_update AFTER UPDATE OF view_count ON views
+                BEGIN UPDATE videos SET view_count = COALESCE(NEW.view_count, 0) WHERE filename = NEW.filename; END;
+            CREATE TRIGGER IF NOT EXISTS views_push_delete AFTER DELETE ON views
+                BEGIN UPDATE videos SET view_count = 0 WHERE filename = OLD.filename; END;
+            
+            CREATE TRIGGER IF NOT EXISTS favorites_push_insert AFTER INSERT ON favorites
+                BEGIN UPDATE videos SET is_favorite = 1 WHERE filename = NEW.filename; END;
+            CREATE TRIGGER IF NOT EXISTS favorites_push_delete AFTER DELETE ON favorites
+                BEGIN UPDATE videos SET is_favorite = 0 WHERE filename = OLD.filename; END;
+            
+            -- With the sort keys on videos, rating/views listings can walk an index
+            -- (sort key, filename) so keyset pages seek and ties need no sort step
+            -- (see get_videos_page); the single-column versions are superseded
+            DROP INDEX IF EXISTS idx_videos_rating;
+            DROP INDEX IF EXISTS idx_videos_view_count;
+            CREATE INDEX IF NOT EXISTS idx_videos_rating_key ON videos(rating, filename);
+            CREATE INDEX IF NOT EXISTS idx_videos_views_key ON videos(view_count, filename);
+            CREATE INDEX IF NOT EXISTS idx_videos_date_key ON videos(COALESCE(added_date, 0), filename);
+        """)
+    
+    def _scan_video_dir(self, video_dir: str) -> List[os.DirEntry]:
+        """List video entries in video_dir with a single scandir pass"""
+        if not os.path.exists(video_dir):
+            return []
+        with os.scandir(video_dir) as entries:
+            return [
+                entry for entry in entries
+                if entry.name.lower().endswith(self.VIDEO_EXTENSIONS)
+            ]
     
     def migrate_from_json(self, ratings_file: str = "ratings.json", 
                          views_file: str = "views.json",
@@ -195,79 +525,74 @@ class VideoDatabase:
         
         print("Starting migration from JSON to SQLite...")
         
-        # Load JSON data
-        ratings_data = load_json_safe(ratings_file)
-        views_data = load_json_safe(views_file)
-        tags_data = load_json_safe(tags_file)
         favorites_data = load_json_safe(favorites_file)
         
-        with self.get_connection() as conn:
-            # Get all video files
-            video_files = set()
-            if os.path.exists(video_dir):
-                allowed_extensions = ('.mp4', '.webm', '.ogg')
-                video_files = {
-                    f for f in os.listdir(video_dir) 
-                    if f.lower().endswith(allowed_extensions)
-                }
-            
-            # Add all video files mentioned in JSON data
-            video_files.update(ratings_data.keys())
-            video_files.update(views_data.keys())
-            video_files.update(tags_data.keys())
-            video_files.update(favorites_data.get("favorites", []))
-            
-            print(f"Found {len(video_files)} unique video files")
-            
-            # Insert videos
-            for filename in video_files:
-                video_path = os.path.join(video_dir, filename)
-                added_date = 0
-                file_size = 0
-                
-                if os.path.exists(video_path):
-                    try:
-                        added_date = os.path.getctime(video_path)
-                        file_size = os.path.getsize(video_path)
-                    except OSError:
-                        pass
-                
-                conn.execute("""
-                    INSERT OR REPLACE INTO videos (filename, added_date, file_size)
-                    VALUES (?, ?, ?)
-                """, (filename, added_date, file_size))
-            
-            # Insert ratings
-            for filename, rating in ratings_data.items():
-                conn.execute("""
-                    INSERT OR REPLACE INTO ratings (filename, rating)
-                    VALUES (?, ?)
-                """, (filename, rating))
+        # One scandir pass gives names and stat results together
+        dir_stats = {}
+        for entry in self._scan_video_dir(video_dir):
+            try:
+                dir_stats[entry.name] = entry.stat()
+            except OSError:
+                pass
+        
+        def file_row(filename: str):
+            st = dir_stats.get(filename)
+            if st is None:
+                try:
+                    st = os.stat(os.path.join(video_dir, filename))
+                except OSError:
+                    return (filename, 0, 0)
+            return (filename, st.st_ctime, st.st_size)
+        
+        # Every filename seen so far already has its videos row
+        video_files = set(dir_stats)
+        
+        def new_video_rows(filenames):
+            fresh = [f for f in dict.fromkeys(filenames) if f not in video_files]
+            video_files.update(fresh)
+            return [file_row(f) for f in fresh]
+        
+        with self.get_writer() as conn:
+            def flush(sql: str, rows: list, filenames: list) -> None:
+                conn.executemany(self._SQL_MIGRATE_VIDEO, new_video_rows(filenames))
+                conn.executemany(sql, rows)
+                self._commit(conn)
             
-            # Insert views
-            for filename, view_count in views_data.items():
-                conn.execute("""
-                    INSERT OR REPLACE INTO views (filename, view_count)
-                    VALUES (?, ?)
-                """, (filename, view_count))
+            conn.executemany(self._SQL_MIGRATE_VIDEO, [file_row(f) for f in video_files])
             
-            # Insert tags
-            for filename, tag_list in tags_data.items():
-                for tag in tag_list:
-                    conn.execute("""
-                        INSERT OR IGNORE INTO video_tags (filename, tag)
-                        VALUES (?, ?)
-                    """, (filename, tag))
+            # Ratings, views and tags may be large: stream them in batches
+            for filepath, sql, explode in (
+                (ratings_file,
+                 "INSERT OR REPLACE INTO ratings (filename, rating) VALUES (?, ?)",
+                 False),
+                (views_file,
+                 "INSERT OR REPLACE INTO views (filename, view_count) VALUES (?, ?)",
+                 False),
+                (tags_file,
+                 "INSERT OR IGNORE INTO video_tags (filename, tag) VALUES (?, ?)",
+                 True),
+            ):
+                rows, filenames = [], []
+                for filename, value in _iter_json_object(filepath):
+                    filenames.append(filename)
+                    if explode:
+                        rows.extend((filename, tag) for tag in value)
+                    else:
+                        rows.append((filename, value))
+                    if len(rows) >= self.MIGRATION_BATCH_SIZE:
+                        flush(sql, rows, filenames)
+                        rows, filenames = [], []
+                flush(sql, rows, filenames)
             
-            # Insert favorites
-            for filename in favorites_data.get("favorites", []):
-                conn.execute("""
-                    INSERT OR REPLACE INTO favorites (filename)
-                    VALUES (?)
-                """, (filename,))
+            favorites = favorites_data.get("favorites", [])
+            flush("INSERT OR REPLACE INTO favorites (filename) VALUES (?)",
+                  [(filename,) for filename in favorites], favorites)
             
-            conn.commit()
+            print(f"Found {len(video_files)} unique video files")
             print("Migration completed successfully!")
+        
+        # Populate sqlite_stat1 before production queries run
+        self.optimize(full=True)
 
     def import_sidecar_tags(self, video_dir: str = "videos") -> Dict[str, int]:
         """
@@ -281,7 +606,7 @@ class VideoDatabase:
         if not video_root.exists():
             return {"sidecars_scanned": 0, "tag_rows_added": 0}
 
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             for sidecar in video_root.glob("*.json"):
                 video_filename = sidecar.name[:-5]
                 if not (video_root / video_filename).exists():
@@ -313,7 +638,7 @@ class VideoDatabase:
                     )
                     if result.rowcount:
                         tag_rows_added += 1
-            conn.commit()
+            self._commit(conn)
 
         return {"sidecars_scanned": sidecar_count, "tag_rows_added": tag_rows_added}
     
@@ -323,8 +648,9 @@ class VideoDatabase:
         order: str = 'desc',
         limit: int | None = None,
         offset: int = 0,
+        min_rating: float | None = None,
     ) -> List[Dict]:
-        """Get all videos with metadata efficiently (supports limit/offset)"""
+        """Get all videos with metadata efficiently (supports limit/offset and a rating floor)"""
         order_clause = 'DESC' if order.lower() == 'desc' else 'ASC'
         
         # Map sort parameters to SQL columns
@@ -333,244 +659,253 @@ class VideoDatabase:
             'filename': 'v.filename', 
             'date': 'v.added_date',
             'added_date': 'v.added_date',
-            'rating': 'COALESCE(r.rating, 0)',
-            'views': 'COALESCE(view.view_count, 0)'
+            'rating': 'v.rating',
+            'views': 'v.view_count'
         }
         
         sort_column = sort_mapping.get(sort_by, 'v.added_date')
         
-        limit_clause = ""
+        # Ties fall back to newest first
+        if sort_column != 'v.added_date':
+            order_clause += ', v.added_date DESC'
+
+        where_clause = ""
         params: list = []
+        if min_rating is not None:
+            where_clause = " WHERE v.rating >= ?"
+            params.append(min_rating)
+
+        limit_clause = ""
         if limit is not None:
             limit_clause = " LIMIT ? OFFSET ?"
             params.extend([max(1, limit), max(0, offset)])
 
-        with self.get_connection() as conn:
+        # Tags come from a correlated subquery rather than a GROUP BY so the
+        # date/filename sorts can walk idx_videos_added_date or the primary key.
+        # json_group_array keeps tags containing commas intact.
+        with self.get_reader() as conn:
             cursor = conn.execute(f"""
                 SELECT 
                     v.filename,
                     v.added_date,
                     v.file_size,
-                    COALESCE(r.rating, 0) as rating,
-                    COALESCE(view.view_count, 0) as views,
-                    GROUP_CONCAT(vt.tag) as tags,
-                    CASE WHEN f.filename IS NOT NULL THEN 1 ELSE 0 END as is_favorite
-                FROM videos v
-                LEFT JOIN ratings r ON v.filename = r.filename
-                LEFT JOIN views view ON v.filename = view.filename
-                LEFT JOIN video_tags vt ON v.filename = vt.filename
-                LEFT JOIN favorites f ON v.filename = f.filename
-                GROUP BY v.filename, v.added_date, v.file_size, r.rating, view.view_count, f.filename
+                    v.rating,
+                    v.view_count as views,
+                    (SELECT json_group_array(t.tag) FROM video_tags t
+                     WHERE t.filename = v.filename) as tags,
+                    v.is_favorite
+                FROM videos v{where_clause}
                 ORDER BY {sort_column} {order_clause}{limit_clause}
             """, params)
             
-            videos = []
-            for row in cursor:
-                tags = row['tags'].split(',') if row['tags'] else []
-                videos.append({
-                    'filename': row['filename'],
-                    'added_date': row['added_date'],
-                    'file_size': row['file_size'],
-                    'rating': row['rating'],
-                    'views': row['views'],
-                    'tags': tags,
-                    'is_favorite': bool(row['is_favorite'])
-                })
-            
-            return videos
+            return [_video_from_row(row) for row in cursor.fetchall()]
     
+    # Keyset sort expressions; must match the index expressions to use them
+    _KEYSET_SORT_COLUMNS = {
+        'title': 'v.filename',
+        'filename': 'v.filename',
+        'date': 'COALESCE(v.added_date, 0)',
+        'added_date': 'COALESCE(v.added_date, 0)',
+        'rating': 'v.rating',
+        'views': 'v.view_count',
+    }
+
+    def get_videos_page(
+        self,
+        sort_by: str = 'added_date',
+        order: str = 'desc',
+        limit: int = 60,
+        after: Optional[tuple] = None,
+        before: Optional[tuple] = None,
+        offset: int = 0,
+    ) -> List[Dict]:
+        """Keyset page of videos ordered by (sort value, filename).
+
+        ``after``/``before`` are (sort value, filename) keys of the row just
+        outside the page. The page is read as two index range seeks: the rest
+        of the key's tie group, then the rows past the key. Neither touches
+        rows before the cursor, so deep pages cost the same as the first
+        (a single row-value or OR predicate would scan through large tie
+        groups such as rating 0). Rows come back in listing order;
+        ``offset`` is only for jumping straight to a numbered page.
+        """
+        sort_column = self._KEYSET_SORT_COLUMNS.get(sort_by, 'COALESCE(v.added_date, 0)')
+        descending = order.lower() == 'desc'
+        backwards = before is not None and after is None
+        # Paging backwards scans the opposite way, then flips the rows
+        scan_desc = descending != backwards
+        direction = 'DESC' if scan_desc else 'ASC'
+        op = '<' if scan_desc else '>'
+        by_filename = sort_column == 'v.filename'
+        order_by = f"v.filename {direction}" if by_filename else f"{sort_column} {direction}, v.filename {direction}"
+        limit = max(1, limit)
+        key = before if backwards else after
+
+        with self.get_reader() as conn:
+            def page(where_clause: str, params: list, order_clause: str, count: int, skip: int = 0) -> List[Dict]:
+                cursor = conn.execute(f"""
+                    SELECT
+                        v.filename,
+                        v.added_date,
+                        v.file_size,
+                        v.rating,
+                        v.view_count as views,
+                        (SELECT json_group_array(t.tag) FROM video_tags t
+                         WHERE t.filename = v.filename) as tags,
+                        v.is_favorite
+                    FROM videos v{where_clause}
+                    ORDER BY {order_clause}
+                    LIMIT ? OFFSET ?
+                """, [*params, count, skip])
+                return [_video_from_row(row) for row in cursor.fetchall()]
+
+            if key is None:
+                videos = page("", [], order_by, limit, max(0, offset))
+            else:
+                value, filename = key
+                videos = []
+                if not by_filename:
+                    # Remainder of the cursor's tie group: (value, filename op ?)
+                    videos = page(f" WHERE {sort_column} = ? AND v.filename {op} ?",
+                                  [value, filename], f"v.filename {direction}", limit)
+                if len(videos) < limit:
+                    videos += page(f" WHERE {sort_column} {op} ?", [value], order_by, limit - len(videos))
+        if backwards:
+            videos.reverse()
+        return videos
+
     def delete_video_by_filename(self, filename: str) -> None:
         """Delete a video and all its associated data"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             conn.execute("DELETE FROM videos WHERE filename = ?", (filename,))
-            conn.commit()
+            self._commit(conn)
+            if self._known_filenames is not None:
+                self._known_filenames.discard(filename)
     
     def get_video_by_filename(self, filename: str) -> Optional[Dict]:
         """Get single video with all metadata"""
-        with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT 
-                    v.filename,
-                    v.added_date,
-                    v.file_size,
-                    COALESCE(r.rating, 0) as rating,
-                    COALESCE(view.view_count, 0) as views,
-                    GROUP_CONCAT(vt.tag) as tags,
-                    CASE WHEN f.filename IS NOT NULL THEN 1 ELSE 0 END as is_favorite
-                FROM videos v
-                LEFT JOIN ratings r ON v.filename = r.filename
-                LEFT JOIN views view ON v.filename = view.filename
-                LEFT JOIN video_tags vt ON v.filename = vt.filename
-                LEFT JOIN favorites f ON v.filename = f.filename
-                WHERE v.filename = ?
-                GROUP BY v.filename, v.added_date, v.file_size, r.rating, view.view_count, f.filename
-            """, (filename,))
+        with self.get_reader() as conn:
+            cursor = conn.execute(self._SQL_GET_VIDEO, (filename,))
             
             row = cursor.fetchone()
-            if row:
-                tags = row['tags'].split(',') if row['tags'] else []
-                return {
-                    'filename': row['filename'],
-                    'added_date': row['added_date'],
-                    'file_size': row['file_size'],
-                    'rating': row['rating'],
-                    'views': row['views'],
-                    'tags': tags,
-                    'is_favorite': bool(row['is_favorite'])
-                }
-            return None
+            return _video_from_row(row) if row else None
     
+    def get_videos_by_filenames(self, filenames: Iterable[str]) -> List[Dict]:
+        """Get many videos with all metadata, in chunked IN (...) queries"""
+        pending = list(filenames)
+        # Chunks stay under SQLite's bound-parameter limit
+        batch_size = 500
+        videos: List[Dict] = []
+        with self.get_reader() as conn:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                cursor = conn.execute(self._SQL_GET_VIDEOS_IN.format(','.join('?' * len(batch))), batch)
+                videos.extend(_video_from_row(row) for row in cursor)
+        return videos
+
     def update_rating(self, filename: str, rating: int):
         """Update video rating"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             # Ensure video exists
-            conn.execute("INSERT OR IGNORE INTO videos (filename) VALUES (?)", (filename,))
+            self._ensure_video_row(conn, filename)
             # Update rating
-            conn.execute("""
-                INSERT OR REPLACE INTO ratings (filename, rating)
-                VALUES (?, ?)
-            """, (filename, rating))
-            conn.commit()
+            conn.execute(self._SQL_UPSERT_RATING, (filename, rating))
+            self._commit(conn)
     
     def increment_view_count(self, filename: str) -> int:
         """Increment view count and return new count"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             # Ensure video exists
-            conn.execute("INSERT OR IGNORE INTO videos (filename) VALUES (?)", (filename,))
-            
-            # Update view count
-            conn.execute("""
-                INSERT INTO views (filename, view_count, last_viewed)
-                VALUES (?, 1, CURRENT_TIMESTAMP)
-                ON CONFLICT(filename) DO UPDATE SET
-                    view_count = view_count + 1,
-                    last_viewed = CURRENT_TIMESTAMP
-            """, (filename,))
+            self._ensure_video_row(conn, filename)
             
-            # Get new count
-            cursor = conn.execute(
-                "SELECT view_count FROM views WHERE filename = ?", 
-                (filename,)
-            )
-            new_count = cursor.fetchone()['view_count']
-            conn.commit()
+            # Upsert and read back the new count in one statement
+            new_count = conn.execute(self._SQL_INCR_VIEW, (filename,)).fetchone()[0]
+            self._commit(conn)
             return new_count
     
     def add_tag(self, filename: str, tag: str):
         """Add tag to video"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             # Ensure video exists
-            conn.execute("INSERT OR IGNORE INTO videos (filename) VALUES (?)", (filename,))
+            self._ensure_video_row(conn, filename)
             # Add tag
-            conn.execute("""
-                INSERT OR IGNORE INTO video_tags (filename, tag)
-                VALUES (?, ?)
-            """, (filename, tag))
-            conn.commit()
+            conn.execute(self._SQL_ADD_TAG, (filename, tag))
+            self._commit(conn)
     
     def remove_tag(self, filename: str, tag: str):
         """Remove tag from video"""
-        with self.get_connection() as conn:
-            conn.execute("""
-                DELETE FROM video_tags
-                WHERE filename = ? AND tag = ?
-            """, (filename, tag))
-            conn.commit()
+        with self.get_writer() as conn:
+            conn.execute(self._SQL_REMOVE_TAG, (filename, tag))
+            self._commit(conn)
     
     def get_video_tags(self, filename: str) -> List[str]:
         """Get tags for a specific video"""
-        with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT tag FROM video_tags
-                WHERE filename = ?
-                ORDER BY tag
-            """, (filename,))
+        with self.get_reader() as conn:
+            cursor = conn.execute(self._SQL_GET_VIDEO_TAGS, (filename,))
             return [row['tag'] for row in cursor]
     
     def toggle_favorite(self, filename: str) -> bool:
         """Toggle favorite status, return new status"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             # Ensure video exists
-            conn.execute("INSERT OR IGNORE INTO videos (filename) VALUES (?)", (filename,))
+            self._ensure_video_row(conn, filename)
             
             # Check current status
-            cursor = conn.execute(
-                "SELECT filename FROM favorites WHERE filename = ?", 
-                (filename,)
-            )
+            cursor = conn.execute(self._SQL_IS_FAVORITE, (filename,))
             is_favorite = cursor.fetchone() is not None
             
             if is_favorite:
-                conn.execute("DELETE FROM favorites WHERE filename = ?", (filename,))
+                conn.execute(self._SQL_DELETE_FAVORITE, (filename,))
                 new_status = False
             else:
-                conn.execute("INSERT INTO favorites (filename) VALUES (?)", (filename,))
+                conn.execute(self._SQL_ADD_FAVORITE, (filename,))
                 new_status = True
             
-            conn.commit()
+            self._commit(conn)
             return new_status
 
     def set_favorite(self, filename: str, is_favorite: bool):
         """Explicitly set favorite status for a video."""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             # Ensure video exists in base table
-            conn.execute("INSERT OR IGNORE INTO videos (filename) VALUES (?)", (filename,))
+            self._ensure_video_row(conn, filename)
             if is_favorite:
-                conn.execute("INSERT OR IGNORE INTO favorites (filename) VALUES (?)", (filename,))
+                conn.execute(self._SQL_ADD_FAVORITE, (filename,))
             else:
-                conn.execute("DELETE FROM favorites WHERE filename = ?", (filename,))
-            conn.commit()
+                conn.execute(self._SQL_DELETE_FAVORITE, (filename,))
+            self._commit(conn)
     
     def get_favorites(self) -> List[str]:
         """Get list of favorite video filenames"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute("SELECT filename FROM favorites ORDER BY created_at DESC")
             return [row['filename'] for row in cursor]
     
     def get_videos_by_tag(self, tag: str) -> List[Dict]:
-        """Get videos filtered by tag"""
-        with self.get_connection() as conn:
+        """Get videos carrying tag (case-insensitive, with or without '#')"""
+        bare = tag.strip().lstrip('#')
+        with self.get_reader() as conn:
             cursor = conn.execute("""
                 SELECT DISTINCT
                     v.filename,
                     v.added_date,
                     v.file_size,
-                    COALESCE(r.rating, 0) as rating,
-                    COALESCE(view.view_count, 0) as views,
-                    CASE WHEN f.filename IS NOT NULL THEN 1 ELSE 0 END as is_favorite
+                    v.rating,
+                    v.view_count as views,
+                    (SELECT json_group_array(t.tag) FROM video_tags t
+                     WHERE t.filename = v.filename) as tags,
+                    v.is_favorite
                 FROM videos v
                 JOIN video_tags vt ON v.filename = vt.filename
-                LEFT JOIN ratings r ON v.filename = r.filename
-                LEFT JOIN views view ON v.filename = view.filename
-                LEFT JOIN favorites f ON v.filename = f.filename
-                WHERE vt.tag LIKE ?
+                WHERE vt.tag COLLATE NOCASE IN (?, ?)
                 ORDER BY v.added_date DESC
-            """, (f"%{tag}%",))
+            """, (f"#{bare}", bare))
             
-            videos = []
-            for row in cursor:
-                # Get all tags for this video
-                tag_cursor = conn.execute(
-                    "SELECT tag FROM video_tags WHERE filename = ?", 
-                    (row['filename'],)
-                )
-                tags = [t['tag'] for t in tag_cursor]
-                
-                videos.append({
-                    'filename': row['filename'],
-                    'added_date': row['added_date'],
-                    'file_size': row['file_size'],
-                    'rating': row['rating'],
-                    'views': row['views'],
-                    'tags': tags,
-                    'is_favorite': bool(row['is_favorite'])
-                })
-            
-            return videos
+            return [_video_from_row(row) for row in cursor.fetchall()]
     
     def get_all_tags(self) -> List[str]:
         """Get all unique tags"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute("""
                 SELECT DISTINCT tag FROM video_tags
                 ORDER BY tag COLLATE NOCASE
@@ -579,7 +914,7 @@ class VideoDatabase:
     
     def get_popular_tags(self, limit: int = 50) -> List[Dict]:
         """Return tags ordered by usage count"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute("""
                 SELECT tag, COUNT(*) as usage_count
                 FROM video_tags
@@ -595,74 +930,81 @@ class VideoDatabase:
     def get_all_filenames(self, order: str = 'asc') -> List[str]:
         """Return all video filenames from database ordered alphabetically"""
         order_clause = 'DESC' if order.lower() == 'desc' else 'ASC'
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(f"""
                 SELECT filename FROM videos
                 ORDER BY filename COLLATE NOCASE {order_clause}
             """)
             return [row['filename'] for row in cursor]
 
+    def get_all_filenames_set(self) -> set:
+        """Return all video filenames as an unordered set for membership checks"""
+        with self.get_reader() as conn:
+            return {row[0] for row in conn.execute("SELECT filename FROM videos")}
+    
     def get_ratings_map(self) -> Dict[str, int]:
         """Return filename -> rating mapping."""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute("SELECT filename, rating FROM ratings")
             return {row['filename']: row['rating'] for row in cursor}
 
     def get_views_map(self) -> Dict[str, int]:
         """Return filename -> view_count mapping."""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute("SELECT filename, view_count FROM views")
             return {row['filename']: row['view_count'] for row in cursor}
 
     def get_tags_map(self) -> Dict[str, List[str]]:
         """Return filename -> [tags] mapping."""
         tags: Dict[str, List[str]] = {}
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute("SELECT filename, tag FROM video_tags ORDER BY filename")
             for row in cursor:
                 tags.setdefault(row['filename'], []).append(row['tag'])
         return tags
     
-    def get_related_videos(self, filename: str, limit: int = 20) -> List[Dict]:
+    def count_related_videos(self, filename: str) -> int:
+        """Count videos sharing at least one tag with ``filename``"""
+        with self.get_reader() as conn:
+            return conn.execute("""
+                SELECT COUNT(DISTINCT vt.filename)
+                FROM video_tags vt
+                JOIN video_tags shared_tags ON vt.tag = shared_tags.tag
+                WHERE shared_tags.filename = ? AND vt.filename != ?
+            """, (filename, filename)).fetchone()[0]
+
+    def get_related_videos(self, filename: str, limit: int = 20, offset: int = 0) -> List[Dict]:
         """Get related videos based on shared tags"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute("""
-                SELECT DISTINCT
+                SELECT
                     v.filename,
                     v.added_date,
-                    COALESCE(r.rating, 0) as rating,
-                    COALESCE(view.view_count, 0) as views,
+                    v.rating,
+                    v.view_count as views,
+                    (SELECT json_group_array(t.tag) FROM video_tags t
+                     WHERE t.filename = v.filename) as tags,
                     COUNT(shared_tags.tag) as tag_overlap
                 FROM videos v
                 JOIN video_tags vt ON v.filename = vt.filename
                 JOIN video_tags shared_tags ON vt.tag = shared_tags.tag
-                LEFT JOIN ratings r ON v.filename = r.filename
-                LEFT JOIN views view ON v.filename = view.filename
                 WHERE shared_tags.filename = ? AND v.filename != ?
-                GROUP BY v.filename, v.added_date, r.rating, view.view_count
-                ORDER BY tag_overlap DESC, r.rating DESC
-                LIMIT ?
-            """, (filename, filename, limit))
+                GROUP BY v.filename
+                ORDER BY tag_overlap DESC, v.rating DESC, v.filename
+                LIMIT ? OFFSET ?
+            """, (filename, filename, limit, offset))
             
-            videos = []
-            for row in cursor:
-                # Get tags for this video
-                tag_cursor = conn.execute(
-                    "SELECT tag FROM video_tags WHERE filename = ?", 
-                    (row['filename'],)
-                )
-                tags = [t['tag'] for t in tag_cursor]
-                
-                videos.append({
-                    'filename': row['filename'],
-                    'added_date': row['added_date'],
-                    'rating': row['rating'],
-                    'views': row['views'],
-                    'tags': tags,
-                    'tag_overlap': row['tag_overlap']
-                })
-            
-            return videos
+            return [
+                {
+                    'filename': name,
+                    'added_date': added_date,
+                    'rating': rating,
+                    'views': views,
+                    'tags': json.loads(tags),
+                    'tag_overlap': tag_overlap
+                }
+                for name, added_date, rating, views, tags, tag_overlap in cursor.fetchall()
+            ]
     
     def cleanup_orphaned_data(self):
         """Remove data for videos that no longer exist on disk"""
@@ -671,28 +1013,28 @@ class VideoDatabase:
             return
         
         # Get actual video files
-        allowed_extensions = ('.mp4', '.webm', '.ogg')
-        actual_files = {
-            f for f in os.listdir(video_dir) 
-            if f.lower().endswith(allowed_extensions)
-        }
+        actual_files = {entry.name for entry in self._scan_video_dir(video_dir)}
         
-        with self.get_connection() as conn:
-            # Get videos in database
-            cursor = conn.execute("SELECT filename FROM videos")
-            db_videos = {row['filename'] for row in cursor}
-            
-            # Find orphaned entries
-            orphaned = db_videos - actual_files
-            
-            if orphaned:
-                print(f"Removing data for {len(orphaned)} orphaned videos...")
-                for filename in orphaned:
-                    conn.execute("DELETE FROM videos WHERE filename = ?", (filename,))
-                conn.commit()
-                print("Cleanup completed")
-            else:
-                print("No orphaned data found")
+        # Find orphaned entries
+        orphaned = self.get_all_filenames_set() - actual_files
+        
+        if not orphaned:
+            print("No orphaned data found")
+            return
+        
+        print(f"Removing data for {len(orphaned)} orphaned videos...")
+        # Chunked IN (...) deletes stay under SQLite's bound-parameter limit
+        batch_size = 500
+        pending = list(orphaned)
+        with self.get_writer() as conn:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                placeholders = ','.join('?' * len(batch))
+                conn.execute(f"DELETE FROM videos WHERE filename IN ({placeholders})", batch)
+            self._commit(conn)
+            if self._known_filenames is not None:
+                self._known_filenames -= orphaned
+        print("Cleanup completed")
     
     def register_media_hash(self, media_hash: str, filename: str) -> None:
         """
@@ -702,12 +1044,12 @@ class VideoDatabase:
             media_hash: SHA256 hash (16-char prefix) of filename
             filename: Actual video filename
         """
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             conn.execute("""
                 INSERT OR REPLACE INTO media_hash_map (media_hash, filename)
                 VALUES (?, ?)
             """, (media_hash, filename))
-            conn.commit()
+            self._commit(conn)
     
     def get_filename_by_hash(self, media_hash: str) -> Optional[str]:
         """
@@ -719,7 +1061,7 @@ class VideoDatabase:
         Returns:
             Filename if found, else None
         """
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(
                 "SELECT filename FROM media_hash_map WHERE media_hash = ?",
                 (media_hash,)
@@ -737,7 +1079,7 @@ class VideoDatabase:
         Returns:
             Media hash if found, else None
         """
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(
                 "SELECT media_hash FROM media_hash_map WHERE filename = ?",
                 (filename,)
@@ -764,7 +1106,7 @@ class VideoDatabase:
         base_slug = re.sub(r'[\s_]+', '-', base_slug).strip('-') or 'group'
         slug = base_slug
         
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             # Ensure slug uniqueness by suffixing when needed
             suffix = 2
             while True:
@@ -782,12 +1124,12 @@ class VideoDatabase:
                    VALUES (?, ?, ?)""",
                 (name, slug, cover_image)
             )
-            conn.commit()
+            self._commit(conn)
             return cursor.lastrowid
 
     def get_gallery_groups(self) -> List[Dict]:
         """Get all gallery groups with image count"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(
                 """SELECT id, name, slug, cover_image,
                    (SELECT COUNT(*) FROM gallery_group_items 
@@ -800,7 +1142,7 @@ class VideoDatabase:
 
     def get_gallery_group_by_slug(self, slug: str) -> Optional[Dict]:
         """Get a gallery group by slug"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(
                 """SELECT id, name, slug, cover_image,
                    (SELECT COUNT(*) FROM gallery_group_items 
@@ -815,7 +1157,7 @@ class VideoDatabase:
 
     def get_gallery_group_by_id(self, group_id: int) -> Optional[Dict]:
         """Get a gallery group by ID"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(
                 """SELECT id, name, slug, cover_image,
                    (SELECT COUNT(*) FROM gallery_group_items 
@@ -831,7 +1173,7 @@ class VideoDatabase:
     # --- Perceptual hash cache helpers ---
     def upsert_phash(self, filename: str, kind: str, phash: str) -> None:
         """Insert or update a perceptual hash for a media item."""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             conn.execute(
                 """INSERT INTO phash_cache (filename, kind, phash)
                    VALUES (?, ?, ?)
@@ -840,11 +1182,11 @@ class VideoDatabase:
                        updated_at = CURRENT_TIMESTAMP""",
                 (filename, kind, phash)
             )
-            conn.commit()
+            self._commit(conn)
 
     def get_phash(self, filename: str, kind: str) -> Optional[str]:
         """Fetch perceptual hash for a media item."""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             row = conn.execute(
                 "SELECT phash FROM phash_cache WHERE filename = ? AND kind = ?",
                 (filename, kind)
@@ -853,7 +1195,7 @@ class VideoDatabase:
 
     def get_all_phashes(self, kind: str) -> List[Dict]:
         """Get all phashes for a given media kind."""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             rows = conn.execute(
                 "SELECT filename, phash FROM phash_cache WHERE kind = ?",
                 (kind,)
@@ -870,7 +1212,7 @@ class VideoDatabase:
             group_id: ID of the group
             image_paths: List of image file paths
         """
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             # Get existing images in this group
             cursor = conn.execute(
                 """SELECT image_path FROM gallery_group_items
@@ -897,11 +1239,11 @@ class VideoDatabase:
                         (group_id, image_path, max_pos + idx + 1)
                     )
                     existing.add(image_path)
-            conn.commit()
+            self._commit(conn)
 
     def get_group_images(self, group_id: int) -> List[str]:
         """Get all image paths in a group, ordered by position"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(
                 """SELECT image_path FROM gallery_group_items
                    WHERE group_id = ?
@@ -910,9 +1252,15 @@ class VideoDatabase:
             )
             return [row['image_path'] for row in cursor.fetchall()]
 
+    def get_grouped_image_paths(self) -> Set[str]:
+        """Every image path that belongs to at least one gallery group"""
+        with self.get_reader() as conn:
+            cursor = conn.execute("SELECT DISTINCT image_path FROM gallery_group_items")
+            return {row[0] for row in cursor}
+
     def get_group_images_with_ids(self, group_id: int) -> List[Dict]:
         """Get all images in a group with their IDs, ordered by position"""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(
                 """SELECT id, image_path FROM gallery_group_items
                    WHERE group_id = ?
@@ -923,7 +1271,7 @@ class VideoDatabase:
 
     def get_groups_for_image(self, image_path: str) -> List[Dict]:
         """Get all gallery groups that currently contain an image."""
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.execute(
                 """SELECT gallery_groups.id, gallery_groups.name,
                           gallery_groups.slug, gallery_groups.cover_image
@@ -939,18 +1287,18 @@ class VideoDatabase:
     def remove_image_from_group(self, group_id: int,
                                 image_path: str) -> None:
         """Remove an image from a gallery group"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             conn.execute(
                 """DELETE FROM gallery_group_items
                    WHERE group_id = ? AND image_path = ?""",
                 (group_id, image_path)
             )
-            conn.commit()
+            self._commit(conn)
 
     def remove_image_item_by_id(self, item_id: int,
                                 group_id: Optional[int] = None) -> bool:
         """Remove a specific image item by ID, optionally constrained to a group."""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             if group_id is None:
                 cursor = conn.execute(
                     """DELETE FROM gallery_group_items WHERE id = ?""",
@@ -962,37 +1310,57 @@ class VideoDatabase:
                        WHERE id = ? AND group_id = ?""",
                     (item_id, group_id)
                 )
-            conn.commit()
+            self._commit(conn)
             return cursor.rowcount > 0
 
     def update_group_name(self, group_id: int, name: str) -> None:
         """Update a gallery group's name"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             conn.execute(
                 """UPDATE gallery_groups SET name = ?
                    WHERE id = ?""",
                 (name, group_id)
             )
-            conn.commit()
+            self._commit(conn)
 
     def update_group_cover_image(self, group_id: int, cover_image: str) -> None:
         """Update a gallery group's cover image"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             conn.execute(
                 """UPDATE gallery_groups SET cover_image = ?
                    WHERE id = ?""",
                 (cover_image, group_id)
             )
-            conn.commit()
+            self._commit(conn)
 
     def delete_gallery_group(self, group_id: int) -> None:
         """Delete a gallery group (items deleted via CASCADE)"""
-        with self.get_connection() as conn:
+        with self.get_writer() as conn:
             conn.execute(
                 "DELETE FROM gallery_groups WHERE id = ?",
                 (group_id,)
             )
-            conn.commit()
+            self._commit(conn)
+
+
+_shared_databases: Dict[str, VideoDatabase] = {}
+_shared_databases_lock = threading.Lock()
+
+
+def get_video_database() -> VideoDatabase:
+    """Process-wide VideoDatabase for the configured LVS_DB_PATH.
+
+    Constructing VideoDatabase re-runs init_database and opens its own
+    reader pool and writer; request handlers share this one instead.
+    """
+    db_path = os.environ.get("LVS_DB_PATH", "data/video_metadata.db")
+    db = _shared_databases.get(db_path)
+    if db is None:
+        with _shared_databases_lock:
+            db = _shared_databases.get(db_path)
+            if db is None:
+                db = _shared_databases[db_path] = VideoDatabase(db_path)
+    return db
 
 
 def migration_script():
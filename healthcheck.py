@@ -10,10 +10,20 @@ Exit codes:
 
 from __future__ import annotations
 import os, sys, json, time, shutil, socket, subprocess, ctypes, platform
+import errno
+import functools
+import selectors
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, Any, Tuple, List, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ---------- Defaults (override via env or CLI flags later if you like) ----------
 CFG = {
     "APP_HOST": os.getenv("LVS_HOST", "127.0.0.1"),
@@ -53,8 +63,23 @@ CFG = {
         os.getenv("LVS_MAX_TRANSCODE_BITRATE", "15000000")
     ),  # 15 Mbps
     "WAL_REQUIRED": True,  # per spec use WAL mode
+    "INTEGRITY_INTERVAL_HOURS": int(os.getenv("LVS_INTEGRITY_INTERVAL_HOURS", "24")),
 }
 
+_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+VIDEO_EXTS = frozenset({".mp4", ".mkv", ".mov", ".webm"})
+MEILI_CACHE_TTL = 5.0  # seconds a Meilisearch probe result is reused
+
+_meili_cache: Dict[Tuple[str, int, str], Tuple[float, Dict[str, Any]]] = {}
+
+# db_path -> (unix timestamp, PRAGMA integrity_check result)
+_integrity_results: Dict[str, Tuple[float, str]] = {}
+_integrity_running: set = set()
+_integrity_lock = threading.Lock()
+
+# root -> {dir_path: (dir mtime_ns, bytes of files directly in dir, subdirs)}
+_dir_usage: Dict[str, Dict[str, Tuple[int, int, Tuple[str, ...]]]] = {}
+
 
 # ---------- Helpers ----------
 def _ok(msg, **extra):
@@ -70,11 +95,10 @@ def _fail(msg, **extra):
 
 
 def _bytes_fmt(n: int) -> str:
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if n < 1024:
-            return f"{n:.1f} {unit}"
-        n /= 1024  # type: ignore
-    return f"{n:.1f} PB"
+    # Unit index straight from the bit length: every 10 bits is one step of 1024
+    n = int(n)
+    i = min(5, (n.bit_length() - 1) // 10) if n >= 1024 else 0
+    return f"{n / (1 << (10 * i)):.1f} {_UNITS[i]}"
 
 
 def _drive_free_bytes(path: str) -> int:
@@ -84,14 +108,60 @@ def _drive_free_bytes(path: str) -> int:
         return -1
 
 
+_CONNECT_PENDING = {
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    errno.EALREADY,
+    getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK),
+}
+
+
+def _check_ports_open(
+    pairs: List[Tuple[str, int]], timeout=0.5
+) -> Dict[Tuple[str, int], bool]:
+    """Probe several TCP ports at once with non-blocking connects.
+
+    All connects are started up front and a single selector waits for them,
+    so N closed/filtered ports cost one timeout instead of N.
+    """
+    results = {pair: False for pair in pairs}
+    sel = selectors.DefaultSelector()
+    try:
+        for pair in results:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setblocking(False)
+            try:
+                rc = s.connect_ex(pair)
+            except OSError:
+                s.close()
+                continue
+            if rc == 0:
+                results[pair] = True
+                s.close()
+            elif rc in _CONNECT_PENDING:
+                sel.register(s, selectors.EVENT_WRITE, pair)
+            else:
+                s.close()
+
+        deadline = time.monotonic() + timeout
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in sel.select(remaining):
+                s = key.fileobj
+                results[key.data] = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                sel.unregister(s)
+                s.close()
+    finally:
+        for key in list(sel.get_map().values()):
+            key.fileobj.close()
+        sel.close()
+    return results
+
+
 def _check_port_open(host: str, port: int, timeout=0.5) -> bool:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.settimeout(timeout)
-        try:
-            s.connect((host, port))
-            return True
-        except Exception:
-            return False
+    return _check_ports_open([(host, port)], timeout)[(host, port)]
 
 
 def _run(cmd: List[str], timeout: int = 6) -> Tuple[int, str, str]:
@@ -102,32 +172,59 @@ def _run(cmd: List[str], timeout: int = 6) -> Tuple[int, str, str]:
         return 127, "", str(e)
 
 
+def _scan_tree(path: str):
+    """Yield (dir_path, file DirEntries) per directory via os.scandir.
+
+    DirEntry type checks come from the directory listing itself, so files are
+    only stat'ed when a caller needs size/mtime. Directory symlinks are not
+    followed (same as os.walk).
+    """
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        files = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            files.append(entry)
+                    except OSError:
+                        pass
+        except OSError:
+            continue
+        yield current, files
+
+
 def _recent_file_in(dir_path: str, within_hours: int) -> Optional[Path]:
-    p = Path(dir_path)
-    if not p.exists():
+    if not os.path.exists(dir_path):
         return None
     fresh_after = time.time() - within_hours * 3600
     newest = None
-    newest_ts = 0
-    for f in p.rglob("*"):
-        if f.is_file():
-            ts = f.stat().st_mtime
-            freshest = newest_ts
-            if ts > freshest:
-                newest = f
-                newest_ts = int(ts)
+    newest_ts = 0.0
+    for _, files in _scan_tree(dir_path):
+        for entry in files:
+            try:
+                ts = entry.stat().st_mtime
+            except OSError:
+                continue
+            if ts > newest_ts:
+                newest = entry.path
+                newest_ts = ts
     if newest and newest_ts >= fresh_after:
-        return newest
+        return Path(newest)
     return None
 
 
 def _sum_dir_bytes(path: str, limit_files: Optional[int] = None) -> int:
     total = 0
     count = 0
-    for root, _, files in os.walk(path):
-        for name in files:
+    for _, files in _scan_tree(path):
+        for entry in files:
             try:
-                total += Path(root, name).stat().st_size
+                total += entry.stat().st_size
             except OSError:
                 pass
             count += 1
@@ -136,6 +233,50 @@ def _sum_dir_bytes(path: str, limit_files: Optional[int] = None) -> int:
     return total
 
 
+def _cached_dir_bytes(path: str) -> int:
+    """Total file bytes under path, rescanning only directories whose mtime moved.
+
+    Each directory's direct file total is remembered against its mtime, so a
+    repeat call costs one stat() per directory rather than one per file.
+    Directories whose entries changed (files added, removed or renamed) are
+    listed again; in-place growth of an existing file is picked up the next
+    time its directory changes.
+    """
+    previous = _dir_usage.get(path, {})
+    current: Dict[str, Tuple[int, int, Tuple[str, ...]]] = {}
+    total = 0
+    stack = [path]
+    while stack:
+        d = stack.pop()
+        try:
+            mtime_ns = os.stat(d).st_mtime_ns
+        except OSError:
+            continue
+        entry = previous.get(d)
+        if entry is None or entry[0] != mtime_ns:
+            direct = 0
+            subdirs = []
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        try:
+                            if e.is_dir(follow_symlinks=False):
+                                subdirs.append(e.path)
+                            elif e.is_file():
+                                direct += e.stat().st_size
+                        except OSError:
+                            pass
+            except OSError:
+                continue
+            entry = (mtime_ns, direct, tuple(subdirs))
+        current[d] = entry
+        total += entry[1]
+        stack.extend(entry[2])
+    _dir_usage[path] = current
+    return total
+
+
+@functools.lru_cache(maxsize=1)
 def _is_admin_windows() -> bool:
     if platform.system() != "Windows":
         return True
@@ -146,8 +287,9 @@ def _is_admin_windows() -> bool:
 
 
 # ---------- Checks ----------
-def check_app_port(cfg) -> Dict[str, Any]:
-    port_ok = _check_port_open(cfg["APP_HOST"], cfg["APP_PORT"])
+def check_app_port(cfg, port_ok: Optional[bool] = None) -> Dict[str, Any]:
+    if port_ok is None:
+        port_ok = _check_port_open(cfg["APP_HOST"], cfg["APP_PORT"])
     return (
         _ok("App HTTP port open")
         if port_ok
@@ -159,7 +301,59 @@ def check_app_port(cfg) -> Dict[str, Any]:
     )
 
 
-def check_sqlite(cfg) -> Dict[str, Any]:
+def _in_quiet_hours(cfg) -> bool:
+    now = datetime.now().hour
+    start, end = cfg["QUIET_HOURS_START"], cfg["QUIET_HOURS_END"]
+    return start <= now < end if start < end else (now >= start or now < end)
+
+
+def _run_integrity_check(db_path: str) -> str:
+    import sqlite3
+
+    try:
+        con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=3)
+        try:
+            result = con.execute("PRAGMA integrity_check;").fetchone()[0]
+        finally:
+            con.close()
+    except Exception as e:
+        result = f"error: {e}"
+    with _integrity_lock:
+        _integrity_results[db_path] = (time.time(), result)
+        _integrity_running.discard(db_path)
+    return result
+
+
+def _integrity_status(cfg) -> Optional[Tuple[float, str]]:
+    """Return the last integrity_check result, refreshing it in the background.
+
+    A full integrity_check reads the whole database file, so it runs on a
+    daemon thread at most every INTEGRITY_INTERVAL_HOURS (preferring quiet
+    hours) instead of on every health request.
+    """
+    db_path = cfg["DB_PATH"]
+    interval = cfg["INTEGRITY_INTERVAL_HOURS"] * 3600
+    with _integrity_lock:
+        last = _integrity_results.get(db_path)
+        if db_path in _integrity_running:
+            return last
+        age = time.time() - last[0] if last else None
+        due = (
+            last is None
+            or age >= 2 * interval
+            or (age >= interval and _in_quiet_hours(cfg))
+        )
+        if not due:
+            return last
+        _integrity_running.add(db_path)
+    threading.Thread(
+        target=_run_integrity_check, args=(db_path,), name="sqlite-integrity",
+        daemon=True,
+    ).start()
+    return last
+
+
+def check_sqlite(cfg, full: bool = False) -> Dict[str, Any]:
     import sqlite3
 
     db_path = cfg["DB_PATH"]
@@ -174,8 +368,13 @@ def check_sqlite(cfg) -> Dict[str, Any]:
         wal_mode = cur.execute("PRAGMA journal_mode;").fetchone()[0]
         wal_ok = (wal_mode.lower() == "wal") if cfg["WAL_REQUIRED"] else True
 
-        integrity = cur.execute("PRAGMA integrity_check;").fetchone()[0]
-        integrity_ok = integrity.lower() == "ok"
+        if full:
+            integrity = _run_integrity_check(db_path)
+            checked_at = time.time()
+        else:
+            last = _integrity_status(cfg)
+            checked_at, integrity = last if last else (None, "pending")
+        integrity_ok = integrity.lower() in ("ok", "pending")
 
         # optional tables
         tables = [
@@ -210,6 +409,11 @@ def check_sqlite(cfg) -> Dict[str, Any]:
             "path": db_path,
             "wal_mode": wal_mode,
             "integrity_check": integrity,
+            "integrity_checked_at": (
+                datetime.fromtimestamp(checked_at).isoformat(timespec="seconds")
+                if checked_at
+                else None
+            ),
             "tables": tables,
             "counts": sample_counts,
             "size_bytes": p.stat().st_size,
@@ -219,9 +423,23 @@ def check_sqlite(cfg) -> Dict[str, Any]:
         return _fail("SQLite open/PRAGMA failed", error=str(e), path=db_path)
 
 
-def check_meilisearch(cfg) -> Dict[str, Any]:
+def check_meilisearch(cfg, port_ok: Optional[bool] = None) -> Dict[str, Any]:
+    # Monitors poll /healthz every few seconds; reuse a recent probe result
+    key = (cfg["MEILI_HOST"], cfg["MEILI_PORT"], cfg["INDEX_NAME"])
+    now = time.monotonic()
+    cached = _meili_cache.get(key)
+    if cached and cached[0] > now:
+        return dict(cached[1])
+    result = _probe_meilisearch(cfg, port_ok)
+    _meili_cache[key] = (now + MEILI_CACHE_TTL, result)
+    return dict(result)
+
+
+def _probe_meilisearch(cfg, port_ok: Optional[bool] = None) -> Dict[str, Any]:
     # TCP first
-    if not _check_port_open(cfg["MEILI_HOST"], cfg["MEILI_PORT"]):
+    if port_ok is None:
+        port_ok = _check_port_open(cfg["MEILI_HOST"], cfg["MEILI_PORT"])
+    if not port_ok:
         return _warn(
             "Meilisearch port closed", host=cfg["MEILI_HOST"], port=cfg["MEILI_PORT"]
         )
@@ -267,7 +485,12 @@ def check_cache(cfg) -> Dict[str, Any]:
     if not p.exists():
         return _warn("Cache directory missing", path=cdir)
 
-    used = _sum_dir_bytes(cdir)
+    # A cache on its own volume is measured from the filesystem in O(1);
+    # otherwise fall back to the incremental per-directory totals.
+    if os.path.ismount(cdir):
+        used = shutil.disk_usage(cdir).used
+    else:
+        used = _cached_dir_bytes(cdir)
     cap = cfg["CACHE_CAP_BYTES"]
     ratio = used / cap if cap > 0 else 0
     status = "ok" if ratio <= 0.85 else ("warn" if ratio <= 1.0 else "fail")
@@ -288,19 +511,24 @@ def check_videos_and_sidecars(cfg) -> Dict[str, Any]:
     vdir = Path(cfg["VIDEOS_DIR"])
     if not vdir.exists():
         return _fail("Videos directory not found", path=str(vdir))
-    # quick scan
-    videos = []
+    # quick scan; sidecars are matched against each directory's listing
+    # instead of one exists() call per video
+    root = str(vdir)
+    sidecar_ext = cfg["SIDECAR_EXT"]
     sidecar_mismatches = []
     checked = 0
-    for f in vdir.rglob("*"):
-        if f.suffix.lower() in {".mp4", ".mkv", ".mov", ".webm"}:
-            checked += 1
-            videos.append(f)
-            sc = f.with_suffix(cfg["SIDECAR_EXT"])
-            if not sc.exists():
-                sidecar_mismatches.append(str(f.relative_to(vdir)))
-            if checked >= 200:  # cap for speed
-                break
+    for _, files in _scan_tree(root):
+        names = {entry.name for entry in files}
+        for entry in files:
+            stem, dot, ext = entry.name.rpartition(".")
+            if dot + ext.lower() in VIDEO_EXTS:
+                checked += 1
+                if stem + sidecar_ext not in names:
+                    sidecar_mismatches.append(os.path.relpath(entry.path, root))
+                if checked >= 200:  # cap for speed
+                    break
+        if checked >= 200:
+            break
     return {
         "status": "ok" if len(sidecar_mismatches) == 0 else "warn",
         "msg": (
@@ -314,11 +542,24 @@ def check_videos_and_sidecars(cfg) -> Dict[str, Any]:
 
 
 def check_ffmpeg(cfg) -> Dict[str, Any]:
-    rc_v, out_v, err_v = _run([cfg["FFMPEG_BIN"], "-version"])
+    # Key the cached probe on the resolved binary's mtime so a reinstalled
+    # ffmpeg is probed again, while repeat health checks skip both forks.
+    binary = cfg["FFMPEG_BIN"]
+    resolved = shutil.which(binary)
+    try:
+        mtime = os.path.getmtime(resolved) if resolved else 0.0
+    except OSError:
+        mtime = 0.0
+    return dict(_probe_ffmpeg(binary, resolved, mtime))
+
+
+@functools.lru_cache(maxsize=1)
+def _probe_ffmpeg(binary: str, resolved: Optional[str], mtime: float) -> Dict[str, Any]:
+    rc_v, out_v, err_v = _run([binary, "-version"])
     if rc_v != 0:
         return _fail("ffmpeg not available", error=err_v or out_v)
 
-    rc_e, out_e, _ = _run([cfg["FFMPEG_BIN"], "-encoders"])
+    rc_e, out_e, _ = _run([binary, "-encoders"])
     nvenc = "hevc_nvenc" in out_e or "h264_nvenc" in out_e
     return {
         "status": "ok",
@@ -377,10 +618,10 @@ def check_allowlist_and_ssl(cfg) -> Dict[str, Any]:
 
 
 def check_quiet_hours(cfg) -> Dict[str, Any]:
-    now = datetime.now().hour
     start, end = cfg["QUIET_HOURS_START"], cfg["QUIET_HOURS_END"]
-    in_quiet = start <= now < end if start < end else (now >= start or now < end)
-    return _ok("Quiet hours respected", in_quiet=in_quiet, start=start, end=end)
+    return _ok(
+        "Quiet hours respected", in_quiet=_in_quiet_hours(cfg), start=start, end=end
+    )
 
 
 def check_admin_privileges() -> Dict[str, Any]:
@@ -400,19 +641,27 @@ def overall_status(items: Dict[str, Dict[str, Any]]) -> Tuple[str, int]:
     return "ok", 0
 
 
-def run_all(cfg=CFG) -> Dict[str, Any]:
-    checks = {
-        "app_port": check_app_port(cfg),
-        "sqlite": check_sqlite(cfg),
-        "meilisearch": check_meilisearch(cfg),
-        "cache": check_cache(cfg),
-        "videos_sidecars": check_videos_and_sidecars(cfg),
-        "ffmpeg": check_ffmpeg(cfg),
-        "backups": check_backups(cfg),
-        "security": check_allowlist_and_ssl(cfg),
-        "quiet_hours": check_quiet_hours(cfg),
-        "admin": check_admin_privileges(),
+def run_all(cfg=CFG, full: bool = False) -> Dict[str, Any]:
+    # Checks touch independent resources (sockets, subprocesses, directory
+    # trees), so run them concurrently; wall time is the slowest check.
+    app_addr = (cfg["APP_HOST"], cfg["APP_PORT"])
+    meili_addr = (cfg["MEILI_HOST"], cfg["MEILI_PORT"])
+    ports = _check_ports_open([app_addr, meili_addr])
+    calls = {
+        "app_port": (check_app_port, cfg, ports[app_addr]),
+        "sqlite": (check_sqlite, cfg, full),
+        "meilisearch": (check_meilisearch, cfg, ports[meili_addr]),
+        "cache": (check_cache, cfg),
+        "videos_sidecars": (check_videos_and_sidecars, cfg),
+        "ffmpeg": (check_ffmpeg, cfg),
+        "backups": (check_backups, cfg),
+        "security": (check_allowlist_and_ssl, cfg),
+        "quiet_hours": (check_quiet_hours, cfg),
+        "admin": (check_admin_privileges,),
     }
+    with ThreadPoolExecutor(max_workers=len(calls)) as ex:
+        futures = {name: ex.submit(*call) for name, call in calls.items()}
+        checks = {name: fut.result() for name, fut in futures.items()}
     status, code = overall_status(checks)
     return {
         "status": status,
@@ -436,7 +685,7 @@ def run_all(cfg=CFG) -> Dict[str, Any]:
 
 # ---------- CLI ----------
 if __name__ == "__main__":
-    res = run_all(CFG)
+    res = run_all(CFG, full=True)
     print(json.dumps(res, indent=2))
     sys.exit(res["exit_code"])
 
@@ -454,8 +703,9 @@ try:
             if data["status"] == "ok"
             else (206 if data["status"] == "warn" else 503)
         )
+        body = orjson.dumps(data) if orjson is not None else json.dumps(data)
         return Response(
-            content=json.dumps(data), media_type="application/json", status_code=code
+            content=body, media_type="application/json", status_code=code
         )
 
 except Exception:
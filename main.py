@@ -1,5 +1,7 @@
 """Thin bootstrap entrypoint for Local Video Server."""
 
+import logging
+
 from backend.app.factory import create_app
 from backend.app import legacy_runtime as legacy
 from cache_manager import cache
@@ -10,6 +12,12 @@ startup_tasks = legacy.startup_tasks
 
 
 if __name__ == "__main__":
+    config = get_config()
+    logging.basicConfig(
+        level=config.log_level,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
     print("[STARTUP] Starting Local Video Server (factory bootstrap)...")
     backend = "Database" if cache.use_database else "Unavailable"
     print(f"[STARTUP] Backend: {backend}")
@@ -17,5 +25,4 @@ if __name__ == "__main__":
     with app.app_context():
         startup_tasks()
 
-    config = get_config()
     app.run(host=config.host, port=config.port, debug=config.debug, threaded=True)
@@ -8,10 +8,13 @@ import os
 import socket
 import threading
 import time
+from collections import defaultdict, deque
 from dataclasses import dataclass
+from functools import partial
+from itertools import islice
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 try:
     import psutil  # type: ignore
@@ -22,9 +25,35 @@ except Exception:
 
 from backend.app.admin.performance import DEFAULT_WINDOW_SECONDS, get_metrics
 
+try:
+    from flask import has_request_context
+except Exception:  # pragma: no cover - flask is a hard dependency of the app
+    has_request_context = None  # type: ignore
+
 # Allowed windows for aggregation
 ALLOWED_WINDOWS = {300, 900, 3600}
 SNAPSHOT_TTL_SECONDS = 2.0
+# Ring-buffer sizes for recent metrics and per-route samples
+METRICS_HISTORY = 1000
+ROUTE_HISTORY = 100
+# The decorator re-reads process RSS at most this often (seconds)
+RSS_SAMPLE_INTERVAL = 0.5
+
+_PROCESS = psutil.Process() if _PSUTIL_AVAILABLE else None
+_rss_lock = threading.Lock()
+_rss_sample = [float("-inf"), 0.0]  # [monotonic time read, RSS in MB]
+
+
+def _sampled_rss_mb() -> float:
+    """Process RSS in MB, shared between calls within RSS_SAMPLE_INTERVAL."""
+    if _PROCESS is None:
+        return 0.0
+    now = time.monotonic()
+    with _rss_lock:
+        if now - _rss_sample[0] > RSS_SAMPLE_INTERVAL:
+            _rss_sample[0] = now
+            _rss_sample[1] = _PROCESS.memory_info().rss / 1024 / 1024
+        return _rss_sample[1]
 
 
 @dataclass
@@ -38,6 +67,38 @@ class PerformanceMetric:
     timestamp: float
 
 
+@dataclass
+class RouteAgg:
+    """Running count/sum/min/max over one route's sample window."""
+
+    count: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+    # min/max may belong to an evicted sample; rebuilt from the window on read
+    stale_extremes: bool = False
+
+    def add(self, value: float, evicted: Optional[float]) -> None:
+        if evicted is None:
+            self.count += 1
+        else:
+            self.total -= evicted
+            if evicted <= self.min or evicted >= self.max:
+                self.stale_extremes = True
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def refresh(self, samples: Deque[float]) -> None:
+        """Recompute from the window; also clears float drift in the running sum."""
+        self.count = len(samples)
+        self.total = sum(samples)
+        self.min, self.max = min(samples), max(samples)
+        self.stale_extremes = False
+
+
 class PerformanceMonitor:
     """Performance monitoring singleton bridging diagnostic and admin metrics."""
 
@@ -54,9 +115,13 @@ class PerformanceMonitor:
 
     def __init__(self):
         if not self._initialized:
-            self.metrics: List[PerformanceMetric] = []
+            self.metrics: Deque[PerformanceMetric] = deque(maxlen=METRICS_HISTORY)
             # Legacy stats retained for human readable report output
-            self.route_stats: Dict[str, List[float]] = {}
+            self.route_stats: Dict[str, Deque[float]] = defaultdict(
+                partial(deque, maxlen=ROUTE_HISTORY)
+            )
+            self.route_agg: Dict[str, RouteAgg] = defaultdict(RouteAgg)
+            self._route_lock = threading.Lock()
             self.cache_stats = {
                 "hits": 0,
                 "misses": 0,
@@ -67,10 +132,8 @@ class PerformanceMonitor:
     # --- recorders -------------------------------------------------
 
     def record_metric(self, metric: PerformanceMetric) -> None:
-        """Record a performance metric and keep history bounded."""
+        """Record a performance metric; the deque drops the oldest past its bound."""
         self.metrics.append(metric)
-        if len(self.metrics) > 1000:
-            self.metrics = self.metrics[-1000:]
 
     def record_route_time(
         self,
@@ -84,9 +147,11 @@ class PerformanceMonitor:
         remote_addr: Optional[str] = None,
     ) -> None:
         """Record route execution time and forward to admin metrics."""
-        self.route_stats.setdefault(route, []).append(duration)
-        if len(self.route_stats[route]) > 100:
-            self.route_stats[route] = self.route_stats[route][-100:]
+        with self._route_lock:
+            samples = self.route_stats[route]
+            evicted = samples[0] if len(samples) == samples.maxlen else None
+            samples.append(duration)
+            self.route_agg[route].add(duration, evicted)
 
         try:
             get_metrics().record_endpoint_latency(
@@ -130,26 +195,30 @@ class PerformanceMonitor:
         return (self.cache_stats["hits"] / total) * 100
 
     def get_route_stats(self) -> Dict[str, Dict[str, float]]:
-        """Get aggregated route statistics."""
+        """Get aggregated route statistics (read from the running aggregates)."""
         stats: Dict[str, Dict[str, float]] = {}
-        for route, times in self.route_stats.items():
-            if times:
+        with self._route_lock:
+            for route, agg in self.route_agg.items():
+                if agg.stale_extremes:
+                    agg.refresh(self.route_stats[route])
                 stats[route] = {
-                    "avg_time": sum(times) / len(times),
-                    "min_time": min(times),
-                    "max_time": max(times),
-                    "request_count": len(times),
+                    "avg_time": agg.total / agg.count,
+                    "min_time": agg.min,
+                    "max_time": agg.max,
+                    "request_count": agg.count,
                 }
         return stats
 
     def get_recent_metrics(self, limit: int = 10) -> List[PerformanceMetric]:
         """Get recent performance metrics."""
-        return self.metrics[-limit:]
+        return list(islice(self.metrics, max(0, len(self.metrics) - limit), None))
 
     def reset_stats(self) -> None:
         """Reset all statistics."""
         self.metrics.clear()
-        self.route_stats.clear()
+        with self._route_lock:
+            self.route_stats.clear()
+            self.route_agg.clear()
         self.cache_stats = {"hits": 0, "misses": 0, "total_requests": 0}
 
 
@@ -161,21 +230,22 @@ def performance_monitor(func_name: Optional[str] = None):
     """Decorator to monitor function performance."""
 
     def decorator(func):
+        name = func_name or f"{func.__module__}.{func.__name__}"
+        lowered = name.lower()
+        route_like = "route" in lowered or any(
+            indicator in lowered for indicator in ["index", "watch", "stream", "api"]
+        )
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            name = func_name or f"{func.__module__}.{func.__name__}"
-            process = psutil.Process(os.getpid()) if _PSUTIL_AVAILABLE else None
-            memory_before = (
-                (process.memory_info().rss / 1024 / 1024) if process else 0.0
-            )  # MB
-            start_time = time.time()
+            memory_before = _sampled_rss_mb()  # MB
+            timestamp = time.time()
+            start = time.perf_counter()
             try:
                 return func(*args, **kwargs)
             finally:
-                duration = time.time() - start_time
-                memory_after = (
-                    (process.memory_info().rss / 1024 / 1024) if process else 0.0
-                )  # MB
+                duration = time.perf_counter() - start
+                memory_after = _sampled_rss_mb()  # MB
 
                 monitor.record_metric(
                     PerformanceMetric(
@@ -183,24 +253,13 @@ def performance_monitor(func_name: Optional[str] = None):
                         duration=duration,
                         memory_before=memory_before,
                         memory_after=memory_after,
-                        timestamp=start_time,
+                        timestamp=timestamp,
                     )
                 )
 
                 # Avoid double counting when Flask hooks already capture routes
-                try:
-                    from flask import has_request_context
-                except Exception:
-                    has_request_context = None  # type: ignore
-
                 should_record_route = not (has_request_context and has_request_context())
-                if should_record_route and (
-                    "route" in name.lower()
-                    or any(
-                        indicator in name.lower()
-                        for indicator in ["index", "watch", "stream", "api"]
-                    )
-                ):
+                if should_record_route and route_like:
                     monitor.record_route_time(name, duration)
 
         return wrapper
@@ -302,18 +361,62 @@ def _overall_status(
     return {"overall": status, "issues": issues}
 
 
-def _cache_metrics() -> Dict[str, Any]:
-    preview_dir = Path("static") / "thumbnails"
-    total_bytes = 0
-    file_count = 0
-    if preview_dir.exists():
-        for path in preview_dir.rglob("*"):
-            if path.is_file():
-                file_count += 1
+# Preview-dir walk reused until the dir changes or the TTL lapses:
+# (walked at monotonic, (dir mtime_ns, inode), (bytes, files), ISO time)
+CACHE_METRICS_TTL_SECONDS = 60.0
+_CACHE_WALK: Tuple[float, Optional[Tuple[int, int]], Tuple[int, int], Optional[str]] = (
+    float("-inf"), None, (0, 0), None
+)
+
+
+def _walk_bytes(root: str) -> Tuple[int, int]:
+    """(total bytes, file count) under root. scandir entries give the file
+    type without a stat, and no Path objects are built per entry."""
+    total = 0
+    count = 0
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
                 try:
-                    total_bytes += path.stat().st_size
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                        count += 1
                 except OSError:
                     continue
+    return total, count
+
+
+def _preview_dir_usage(preview_dir: Path) -> Tuple[int, int, Optional[str]]:
+    """(total bytes, file count, walked at) for preview_dir, rewalked only when
+    its mtime/inode change or after CACHE_METRICS_TTL_SECONDS (in-place rewrites
+    don't touch the dir mtime)."""
+    global _CACHE_WALK
+    try:
+        st = preview_dir.stat()
+    except OSError:
+        return 0, 0, None
+    key = (st.st_mtime_ns, st.st_ino)
+    now = time.monotonic()
+    walked_at, cached_key, usage, refreshed_at = _CACHE_WALK
+    if cached_key == key and now - walked_at < CACHE_METRICS_TTL_SECONDS:
+        return usage[0], usage[1], refreshed_at
+
+    total_bytes, file_count = _walk_bytes(str(preview_dir))
+    refreshed_at = _utcnow_iso()
+    _CACHE_WALK = (now, key, (total_bytes, file_count), refreshed_at)
+    return total_bytes, file_count, refreshed_at
+
+
+def _cache_metrics() -> Dict[str, Any]:
+    preview_dir = Path("static") / "thumbnails"
+    total_bytes, file_count, refreshed_at = _preview_dir_usage(preview_dir)
 
     limit_bytes = 50 * 1024 * 1024 * 1024  # 50 GB default upper bound
     usage_ratio = (total_bytes / limit_bytes) if limit_bytes else 0.0
@@ -328,7 +431,7 @@ def _cache_metrics() -> Dict[str, Any]:
         "preview_cache_limit_bytes": int(limit_bytes),
         "preview_cache_usage_ratio": float(usage_ratio),
         "preview_cache_items": file_count,
-        "last_refresh_at": None,
+        "last_refresh_at": refreshed_at,
         "status": status,
     }
 
@@ -584,7 +687,7 @@ def get_system_stats() -> Dict[str, float]:
             "threads": 0,
         }
 
-    process = psutil.Process(os.getpid())  # type: ignore[union-attr]
+    process = _PROCESS  # type: ignore[union-attr]
     disk_io = psutil.disk_io_counters()  # type: ignore[union-attr]
 
     return {
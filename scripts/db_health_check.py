@@ -30,10 +30,14 @@ TABLES = {
 
 EXPECTED_INDEXES = [
     "idx_videos_added_date",
+    "idx_videos_date_key",
+    "idx_videos_rating_key",
+    "idx_videos_views_key",
     "idx_ratings_rating",
     "idx_views_count",
     "idx_views_last_viewed",
-    "idx_tags_tag",
+    "idx_tags_tag_filename",
+    "idx_tags_tag_nocase",
     "idx_tags_filename",
 ]
 
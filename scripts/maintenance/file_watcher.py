@@ -4,24 +4,130 @@ Provides intelligent monitoring with debouncing, batch processing, and duplicate
 """
 
 import os
+import sys
+import json
 import time
+import select
+import struct
+import ctypes
+import ctypes.util
 import threading
 from pathlib import Path
-from typing import Set, Dict, Callable, Any
+from typing import Set, Dict, Callable, Any, Optional, Tuple
+from collections import Counter, defaultdict
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 import hashlib
+import mmap
+
+try:
+    import xxhash  # SIMD xxh3; much faster than md5 for dedup fingerprints
+except ImportError:
+    xxhash = None
 
 try:
     from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
     from watchdog.events import FileSystemEventHandler
     WATCHDOG_AVAILABLE = True
 except ImportError:
     WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
     print("⚠️  Watchdog not available. Install with: pip install watchdog")
 
+# Native inotify backend (Linux) filters events in the kernel
+INOTIFY_AVAILABLE = sys.platform.startswith("linux")
+
+# inotify/ReadDirectoryChangesW miss changes made by other NFS/SMB clients
+NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "9p", "afs", "ceph", "glusterfs"}
+
+# Worker threads for fingerprinting and thumbnail jobs (I/O-bound)
+_WORKER_COUNT = min(8, os.cpu_count() or 4)
+# Fingerprints cover the file size plus this many leading bytes
+HASH_PREFIX_BYTES = 1024 * 1024
+# mmap.madvise is missing on Windows; fall back to plain reads there
+_CAN_MADVISE = hasattr(mmap.mmap, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL")
+_CAN_FADVISE = hasattr(os, "posix_fadvise")
+
+
+def _prefetch_prefix(path: str):
+    """Ask the kernel to start reading a file's hash prefix in the background"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, HASH_PREFIX_BYTES, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _filesystem_type(path: Path) -> str:
+    """Best-effort filesystem type for path ("" when unknown)"""
+    if sys.platform.startswith("win"):
+        target = str(path.resolve())
+        if target.startswith("\\\\"):
+            return "smbfs"  # UNC share
+        try:
+            drive_type = ctypes.windll.kernel32.GetDriveTypeW(target[:3])
+            return "smbfs" if drive_type == 4 else ""  # DRIVE_REMOTE
+        except Exception:
+            return ""
+
+    # Linux: the longest mount point containing path decides
+    target = os.path.realpath(path)
+    best, fstype = "", ""
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace("\\040", " ").replace("\\011", "\t")
+                inside = target == mount_point or target.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best):
+                    best, fstype = mount_point, fields[2]
+    except OSError:
+        pass
+    return fstype
+
+
+def _is_network_filesystem(path: Path) -> bool:
+    fstype = _filesystem_type(path)
+    return fstype in NETWORK_FS_TYPES or fstype.startswith("fuse.")
 
-@dataclass
+
+def _cpu_has_sha_extensions() -> bool:
+    """Detect hardware SHA-256 (x86 SHA-NI / ARMv8 sha2) from /proc/cpuinfo"""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() in ("flags", "Features"):
+                    flags = value.split()
+                    return "sha_ni" in flags or "sha2" in flags
+    except OSError:
+        pass
+    return False
+
+
+# Fingerprint hash: xxh3 when installed; otherwise SHA-256 where the CPU
+# accelerates it (faster than software MD5), else MD5.
+if xxhash is not None:
+    HASH_NAME, _new_digest = "xxh3_128", xxhash.xxh3_128
+elif _cpu_has_sha_extensions():
+    HASH_NAME, _new_digest = "sha256", hashlib.sha256
+else:
+    HASH_NAME, _new_digest = "md5", hashlib.md5
+
+
+# One shared string object per event type
+_EVENT_TYPES = {k: sys.intern(k) for k in ("created", "modified", "deleted", "moved")}
+
+
+@dataclass(slots=True)
 class FileChange:
     """Represents a file system change event"""
     path: str
@@ -29,6 +135,7 @@ class FileChange:
     timestamp: float
     size: int = 0
     checksum: str = ""
+    mtime_ns: int = 0
 
 
 class VideoFileWatcher:
@@ -48,25 +155,55 @@ class VideoFileWatcher:
         debounce_seconds: float = 2.0,
         batch_size: int = 10,
         supported_extensions: Set[str] = None,
+        poll_interval_s: Optional[float] = None,
+        checksum_cache_path: Optional[str] = None,
     ):
 
         self.video_directory = Path(video_directory)
         self.thumbnail_directory = Path(thumbnail_directory)
         self.debounce_seconds = debounce_seconds
         self.batch_size = batch_size
+        # Tree walk period when polling a network share; a 1s default would
+        # re-stat the whole library every second
+        if poll_interval_s is None:
+            poll_interval_s = max(60.0, debounce_seconds * 4)
+        self.poll_interval_s = poll_interval_s
 
         if supported_extensions is None:
             self.supported_extensions = {".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm"}
         else:
             self.supported_extensions = supported_extensions
+        # Lowercased suffix tuple for a single str.endswith() check per path
+        self._ext_tuple = tuple(ext.lower() for ext in self.supported_extensions)
 
         # Internal state
         self._observer = None
         self._is_running = False
-        self._pending_changes: Dict[str, FileChange] = {}
-        self._change_lock = threading.Lock()
-        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="FileWatcher")
-        self._known_files: Dict[str, str] = {}  # path -> checksum for duplicate detection
+        # path -> (event_type, timestamp); FileChange objects are only built
+        # once a path has settled
+        self._pending_changes: Dict[str, Tuple[str, float]] = {}
+        # Guards _pending_changes and wakes the processing thread on new work
+        self._change_lock = threading.Condition()
+        # Per-thread VideoCache invalidators to run once a batch finishes
+        self._batch_state = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=_WORKER_COUNT, thread_name_prefix="FileWatcher"
+        )
+        # path -> (size, mtime_ns, checksum) for duplicate detection; persisted so
+        # unchanged files are not re-hashed on the next start. Kept beside the
+        # metadata DB: the thumbnail tree is publicly served under /static
+        if checksum_cache_path is None:
+            db_path = Path(os.environ.get("LVS_DB_PATH", "data/video_metadata.db"))
+            checksum_cache_path = db_path.parent / ".checksums.json"
+        self._checksum_cache_path = Path(checksum_cache_path)
+        self._cache_lock = threading.Lock()
+        self._known_files: Dict[str, Tuple[int, int, str]] = {}
+        # checksum -> paths, kept in lockstep with _known_files
+        self._by_checksum: Dict[str, Set[str]] = defaultdict(set)
+        # size -> paths; a file whose size no other file shares cannot be a
+        # duplicate, so its checksum ("" until needed) is computed lazily
+        self._by_size: Dict[int, Set[str]] = defaultdict(set)
+        self._reset_known_files(self._load_checksum_cache())
 
         # Callbacks
         self._callbacks: Dict[str, Callable] = {
@@ -89,7 +226,7 @@ class VideoFileWatcher:
 
     def start_watching(self) -> bool:
         """Start watching the video directory"""
-        if not WATCHDOG_AVAILABLE:
+        if not (INOTIFY_AVAILABLE or WATCHDOG_AVAILABLE):
             print("❌ Cannot start file watcher: watchdog library not available")
             return False
 
@@ -105,9 +242,9 @@ class VideoFileWatcher:
             self._scan_existing_files()
 
             # Set up file system observer
-            event_handler = VideoFileEventHandler(self)
-            self._observer = Observer()
-            self._observer.schedule(event_handler, str(self.video_directory), recursive=True)
+            self._observer = self._create_observer()
+            if self._observer is None:
+                return False
             self._observer.start()
 
             self._is_running = True
@@ -118,6 +255,31 @@ class VideoFileWatcher:
             print(f"❌ Failed to start file watcher: {e}")
             return False
 
+    def _create_observer(self):
+        """Poll network shares; otherwise prefer native inotify over watchdog"""
+        if WATCHDOG_AVAILABLE and _is_network_filesystem(self.video_directory):
+            print(
+                f"🌐 Network filesystem detected, polling every {self.poll_interval_s:g}s"
+            )
+            observer = PollingObserver(timeout=self.poll_interval_s)
+            observer.schedule(VideoFileEventHandler(self), str(self.video_directory), recursive=True)
+            return observer
+
+        if INOTIFY_AVAILABLE:
+            try:
+                observer = InotifyObserver(self)
+                observer.schedule(str(self.video_directory))
+                return observer
+            except OSError as e:
+                print(f"⚠️  inotify unavailable ({e}), falling back to watchdog")
+
+        if not WATCHDOG_AVAILABLE:
+            print("❌ Cannot start file watcher: watchdog library not available")
+            return None
+        observer = Observer()
+        observer.schedule(VideoFileEventHandler(self), str(self.video_directory), recursive=True)
+        return observer
+
     def stop_watching(self):
         """Stop watching the video directory"""
         if not self._is_running:
@@ -132,69 +294,241 @@ class VideoFileWatcher:
         self._executor.shutdown(wait=True)
         print("🛑 File watcher stopped")
 
+    def _load_checksum_cache(self) -> Dict[str, Tuple[int, int, str]]:
+        """Load persisted (size, mtime_ns, checksum) entries, if any"""
+        try:
+            with open(self._checksum_cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Digests from a different hash cannot be compared; rehash instead
+            if data.get("hash") != HASH_NAME:
+                return {}
+            return {
+                path: tuple(entry)
+                for path, entry in data["files"].items()
+                if len(entry) == 3
+            }
+        except (OSError, ValueError, TypeError, AttributeError, KeyError):
+            return {}
+
+    def _reset_known_files(self, entries: Dict[str, Tuple[int, int, str]]):
+        """Replace known files and rebuild the checksum and size indexes"""
+        by_checksum: Dict[str, Set[str]] = defaultdict(set)
+        by_size: Dict[int, Set[str]] = defaultdict(set)
+        for path, (size, _, checksum) in entries.items():
+            by_size[size].add(path)
+            if checksum:
+                by_checksum[checksum].add(path)
+        with self._cache_lock:
+            self._known_files = entries
+            self._by_checksum = by_checksum
+            self._by_size = by_size
+
+    def _remember_file(self, change: FileChange):
+        """Record a processed file in both the path map and checksum index"""
+        with self._cache_lock:
+            self._forget_locked(change.path)
+            self._known_files[change.path] = (change.size, change.mtime_ns, change.checksum)
+            self._by_size[change.size].add(change.path)
+            if change.checksum:
+                self._by_checksum[change.checksum].add(change.path)
+
+    def _forget_file(self, path: str):
+        with self._cache_lock:
+            self._forget_locked(path)
+
+    def _forget_locked(self, path: str):
+        entry = self._known_files.pop(path, None)
+        if entry:
+            same_size = self._by_size.get(entry[0])
+            if same_size is not None:
+                same_size.discard(path)
+                if not same_size:
+                    del self._by_size[entry[0]]
+        if entry and entry[2]:
+            peers = self._by_checksum.get(entry[2])
+            if peers is not None:
+                peers.discard(path)
+                if not peers:
+                    del self._by_checksum[entry[2]]
+
+    def _save_checksum_cache(self):
+        """Atomically persist the known-file checksums"""
+        with self._cache_lock:
+            snapshot = dict(self._known_files)
+            tmp_path = self._checksum_cache_path.with_suffix(".tmp")
+            try:
+                self._checksum_cache_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"hash": HASH_NAME, "files": snapshot}, f)
+                os.replace(tmp_path, self._checksum_cache_path)
+            except OSError as e:
+                print(f"⚠️  Could not save checksum cache: {e}")
+
     def _scan_existing_files(self):
         """Scan existing files to build checksum database"""
         print("🔍 Scanning existing video files...")
-        count = 0
-
-        for file_path in self.video_directory.rglob("*"):
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_extensions:
+        candidates = []  # (path, stat) pairs to fingerprint
 
+        stack = [str(self.video_directory)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
                 try:
-                    checksum = self._calculate_checksum(file_path)
-                    self._known_files[str(file_path)] = checksum
-                    count += 1
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not (entry.name.lower().endswith(self._ext_tuple) and entry.is_file()):
+                        continue
+                    candidates.append((entry.path, entry.stat()))
                 except Exception as e:
-                    print(f"⚠️  Error scanning {file_path}: {e}")
-
+                    print(f"⚠️  Error scanning {entry.path}: {e}")
+
+        # Only files sharing a size with another file can be duplicates
+        size_counts = Counter(st.st_size for _, st in candidates)
+        to_hash = [c for c in candidates if size_counts[c[1].st_size] > 1]
+
+        # Queue readahead for every prefix that must be hashed so the disk
+        # sees one deep batch of requests instead of one read per worker
+        if _CAN_FADVISE:
+            for path, st in to_hash:
+                cached = self._known_files.get(path)
+                if not (
+                    cached
+                    and cached[2]
+                    and cached[0] == st.st_size
+                    and cached[1] == st.st_mtime_ns
+                ):
+                    _prefetch_prefix(path)
+
+        # Hashing is I/O-bound, so fan it out on a short-lived pool that does
+        # not compete with event processing on self._executor
+        def fingerprint(candidate):
+            path, st = candidate
+            return self._calculate_checksum(Path(path), st)
+
+        scanned: Dict[str, Tuple[int, int, str]] = {
+            path: (st.st_size, st.st_mtime_ns, "") for path, st in candidates
+        }
+        with ThreadPoolExecutor(
+            max_workers=_WORKER_COUNT, thread_name_prefix="FileWatcherScan"
+        ) as pool:
+            for (path, st), checksum in zip(to_hash, pool.map(fingerprint, to_hash)):
+                scanned[path] = (st.st_size, st.st_mtime_ns, checksum)
+        count = len(scanned)
+
+        # Drop entries for files removed while the watcher was not running
+        self._reset_known_files(scanned)
+        self._save_checksum_cache()
         print(f"✅ Scanned {count} existing video files")
 
-    def _calculate_checksum(self, file_path: Path) -> str:
-        """Calculate MD5 checksum of file (first 1MB for speed)"""
+    def _calculate_checksum(self, file_path: Path, st: Optional[os.stat_result] = None) -> str:
+        """Fingerprint a file from its size and first 1MB (see HASH_NAME)"""
         try:
-            hash_md5 = hashlib.md5()
+            if st is None:
+                st = file_path.stat()
+            # Unchanged size and mtime: reuse the known digest without reading
+            cached = self._known_files.get(str(file_path))
+            if cached and cached[2] and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                return cached[2]
+
+            digest = _new_digest()
             with open(file_path, "rb") as f:
+                # Size separates files that only share a prefix
+                digest.update(st.st_size.to_bytes(8, "little"))
                 # Read first 1MB for speed
-                chunk = f.read(1024 * 1024)
-                hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+                if st.st_size >= HASH_PREFIX_BYTES and _CAN_MADVISE:
+                    # Hash straight from the page cache instead of copying
+                    # the prefix into a bytes object (POSIX only)
+                    with mmap.mmap(
+                        f.fileno(), HASH_PREFIX_BYTES, access=mmap.ACCESS_READ
+                    ) as mm:
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                        mm.madvise(mmap.MADV_WILLNEED)
+                        digest.update(mm)
+                else:
+                    digest.update(f.read(HASH_PREFIX_BYTES))
+            # Keep fingerprints 128-bit hex whichever hash is in use
+            return digest.hexdigest()[:32]
         except Exception:
             return ""
 
+    def _fingerprint(self, change: FileChange):
+        """Fill size, mtime and checksum for a settled change"""
+        try:
+            st = os.stat(change.path)
+        except OSError:
+            return
+        change.size, change.mtime_ns = st.st_size, st.st_mtime_ns
+        with self._cache_lock:
+            peers = [p for p in self._by_size.get(st.st_size, ()) if p != change.path]
+        if not peers:
+            # Unique size: no duplicate possible, skip reading the file
+            change.checksum = ""
+            return
+        change.checksum = self._calculate_checksum(Path(change.path), st)
+        self._backfill_checksums(peers)
+
+    def _backfill_checksums(self, paths: list):
+        """Hash known files that were skipped while their size was unique"""
+        for path in paths:
+            entry = self._known_files.get(path)
+            if entry is None or entry[2]:
+                continue
+            checksum = self._calculate_checksum(Path(path))
+            if not checksum:
+                continue
+            with self._cache_lock:
+                if self._known_files.get(path) == entry:
+                    self._known_files[path] = (entry[0], entry[1], checksum)
+                    self._by_checksum[checksum].add(path)
+
     def _is_video_file(self, file_path: str) -> bool:
         """Check if file is a supported video format"""
-        return Path(file_path).suffix.lower() in self.supported_extensions
+        return file_path.lower().endswith(self._ext_tuple)
 
     def handle_file_event(self, event_type: str, file_path: str):
         """Handle a file system event with debouncing"""
         if not self._is_video_file(file_path):
             return
 
+        # Record only; stat and hashing wait until the path has settled so a
+        # burst of modify events on a file being written costs no I/O.
+        event_type = _EVENT_TYPES.get(event_type, event_type)
         with self._change_lock:
-            # Create file change record
-            try:
-                size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-                checksum = self._calculate_checksum(Path(file_path)) if os.path.exists(file_path) else ""
-            except Exception:
-                size = 0
-                checksum = ""
-
-            change = FileChange(
-                path=file_path,
-                event_type=event_type,
-                timestamp=time.time(),
-                size=size,
-                checksum=checksum,
-            )
+            was_idle = not self._pending_changes
+            previous = self._pending_changes.get(file_path)
+            if (
+                previous is not None
+                and event_type == "modified"
+                and previous[0] in ("created", "moved")
+            ):
+                # A new file being written is still an addition
+                event_type = previous[0]
 
-            # Store with debouncing (latest event wins)
-            self._pending_changes[file_path] = change
+            # Store with debouncing (latest event restarts the timer)
+            self._pending_changes[file_path] = (event_type, time.time())
+            # Later events only push deadlines back, so only the first one
+            # needs to wake the processing thread
+            if was_idle:
+                self._change_lock.notify()
 
     def _process_changes_loop(self):
         """Background thread that processes pending changes"""
         while True:
             try:
-                time.sleep(self.debounce_seconds)
+                with self._change_lock:
+                    # Sleep until there is work, then until the oldest change settles
+                    self._change_lock.wait_for(lambda: self._pending_changes)
+                    while self._pending_changes:
+                        oldest = min(ts for _, ts in self._pending_changes.values())
+                        remaining = oldest + self.debounce_seconds - time.time()
+                        if remaining <= 0:
+                            break
+                        self._change_lock.wait(timeout=remaining)
                 self._process_pending_changes()
             except Exception as e:
                 print(f"❌ Error in change processing loop: {e}")
@@ -210,9 +544,9 @@ class VideoFileWatcher:
             current_time = time.time()
             ready_changes = []
 
-            for path, change in list(self._pending_changes.items()):
-                if current_time - change.timestamp >= self.debounce_seconds:
-                    ready_changes.append(change)
+            for path, (event_type, timestamp) in list(self._pending_changes.items()):
+                if current_time - timestamp >= self.debounce_seconds:
+                    ready_changes.append(FileChange(path, event_type, timestamp))
                     del self._pending_changes[path]
 
             if not ready_changes:
@@ -227,9 +561,15 @@ class VideoFileWatcher:
         """Process a batch of file changes"""
         print(f"🔄 Processing batch of {len(changes)} file changes...")
 
+        # Batches run concurrently, so each worker thread collects its own
+        invalidations: Set[str] = set()
+        self._batch_state.invalidations = invalidations
         processed_count = 0
         for change in changes:
             try:
+                if change.event_type != "deleted":
+                    self._fingerprint(change)
+
                 # Check for duplicates
                 if self._is_duplicate_file(change):
                     print(f"🔍 Duplicate detected: {Path(change.path).name}")
@@ -238,21 +578,26 @@ class VideoFileWatcher:
                 # Process based on event type
                 if change.event_type in ["created", "moved"]:
                     self._callbacks["on_video_added"](change)
-                    self._known_files[change.path] = change.checksum
+                    self._remember_file(change)
                 elif change.event_type == "modified":
                     self._callbacks["on_video_modified"](change)
-                    self._known_files[change.path] = change.checksum
+                    self._remember_file(change)
                 elif change.event_type == "deleted":
                     self._callbacks["on_video_removed"](change)
-                    self._known_files.pop(change.path, None)
+                    self._forget_file(change.path)
 
                 processed_count += 1
 
             except Exception as e:
                 print(f"❌ Error processing {change.path}: {e}")
 
+        # One call per invalidator instead of one per change
+        self._batch_state.invalidations = None
+        self._flush_invalidations(invalidations)
+
         # Notify batch completion
         if processed_count > 0:
+            self._save_checksum_cache()
             self._callbacks["on_batch_processed"](changes, processed_count)
 
     def _is_duplicate_file(self, change: FileChange) -> bool:
@@ -260,15 +605,10 @@ class VideoFileWatcher:
         if not change.checksum:
             return False
 
-        for existing_path, existing_checksum in self._known_files.items():
-            if (
-                existing_checksum == change.checksum
-                and existing_path != change.path
-                and os.path.exists(existing_path)
-            ):
-                return True
-
-        return False
+        # Stale paths are purged on delete events, so no existence check here
+        with self._cache_lock:
+            peers = self._by_checksum.get(change.checksum, ())
+            return any(path != change.path for path in peers)
 
     # Default callback implementations
     def _default_on_video_added(self, change: FileChange):
@@ -276,15 +616,10 @@ class VideoFileWatcher:
         print(f"➕ Video added: {Path(change.path).name} ({change.size:,} bytes)")
 
         # Trigger thumbnail generation
-        self._executor.submit(self._generate_thumbnail_async, change.path)
+        self._generate_thumbnail_async(change.path)
 
         # Invalidate cache if available
-        try:
-            from cache_manager import cache
-
-            cache.invalidate_pattern("video_*")
-        except ImportError:
-            pass
+        self._invalidate_cache("invalidate_video_list", "invalidate_metadata")
 
     def _default_on_video_removed(self, change: FileChange):
         """Default handler for removed video files"""
@@ -300,26 +635,46 @@ class VideoFileWatcher:
             print(f"⚠️  Error removing thumbnail: {e}")
 
         # Invalidate cache
-        try:
-            from cache_manager import cache
-
-            cache.invalidate_pattern("video_*")
-        except ImportError:
-            pass
+        self._invalidate_cache("invalidate_video_list", "invalidate_metadata")
 
     def _default_on_video_modified(self, change: FileChange):
         """Default handler for modified video files"""
         print(f"✏️  Video modified: {Path(change.path).name}")
 
         # Regenerate thumbnail
-        self._executor.submit(self._generate_thumbnail_async, change.path)
+        self._generate_thumbnail_async(change.path)
+
+    def _invalidate_cache(self, *methods: str):
+        """Run VideoCache invalidators, coalesced per batch when inside one"""
+        pending = getattr(self._batch_state, "invalidations", None)
+        if pending is not None:
+            pending.update(methods)
+        else:
+            self._flush_invalidations(set(methods))
+
+    def _flush_invalidations(self, methods: Set[str]):
+        if not methods:
+            return
+        try:
+            from cache_manager import cache
+        except ImportError:
+            return
+        for method in sorted(methods):
+            try:
+                getattr(cache, method)()
+            except Exception as e:
+                print(f"⚠️  Cache invalidation {method} failed: {e}")
 
     def _default_on_batch_processed(self, changes: list, processed_count: int):
         """Default handler for batch completion"""
         print(f"✅ Processed {processed_count}/{len(changes)} file changes")
 
     def _generate_thumbnail_async(self, video_path: str):
-        """Generate thumbnail for video file"""
+        """Queue thumbnail generation for a video file.
+
+        thumbnail_manager runs ffmpeg in child processes from its own worker
+        pool, so this returns immediately and never ties up a batch worker.
+        """
         try:
             from thumbnail_manager import generate_async
 
@@ -365,6 +720,161 @@ class VideoFileEventHandler(FileSystemEventHandler):
             self.watcher.handle_file_event("moved", event.dest_path)
 
 
+class InotifyObserver:
+    """
+    Linux inotify observer with a kernel-side event mask.
+
+    Only completed writes (IN_CLOSE_WRITE), moves and deletes are delivered,
+    so a file being copied in does not raise one event per write() and
+    reads never wake the watcher. One non-recursive watch is kept per
+    directory; new subdirectories are picked up as they appear. Exposes the
+    schedule/start/stop/join subset of the watchdog Observer API in use.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+    WATCH_MASK = (
+        IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    )
+    _EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self, watcher: VideoFileWatcher):
+        self.watcher = watcher
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._wake_r, self._wake_w = os.pipe()
+        self._dirs: Dict[int, str] = {}
+        # Video files created but not yet closed after writing
+        self._created: Set[str] = set()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, path: str):
+        self._add_tree(path)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="InotifyObserver", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        os.write(self._wake_w, b"x")
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _add_tree(self, root: str, report_files: bool = False):
+        """Watch root and its subdirectories; optionally report files already inside"""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                print(f"⚠️  Cannot watch {directory}: {os.strerror(err)}")
+                continue
+            self._dirs[wd] = directory
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif report_files and entry.is_file():
+                            self.watcher.handle_file_event("created", entry.path)
+            except OSError:
+                pass
+
+    def _drop_tree(self, root: str, report_deleted: bool):
+        """Stop watching a directory that went away and forget its files"""
+        prefix = root + os.sep
+        for wd, directory in list(self._dirs.items()):
+            if directory == root or directory.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                self._dirs.pop(wd, None)
+        if report_deleted:
+            for path in list(self.watcher._known_files):
+                if path.startswith(prefix):
+                    self.watcher.handle_file_event("deleted", path)
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                ready, _, _ = select.select([self._fd, self._wake_r], [], [])
+            except OSError:
+                break
+            if self._fd not in ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+            self._dispatch(data)
+
+    def _dispatch(self, data: bytes):
+        header = self._EVENT.size
+        offset = 0
+        while offset + header <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + header:offset + header + length].rstrip(b"\0"))
+            offset += header + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                print("⚠️  inotify queue overflowed; some file changes were missed")
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add_tree(path, report_files=True)
+                elif mask & (self.IN_MOVED_FROM | self.IN_DELETE):
+                    self._drop_tree(path, report_deleted=bool(mask & self.IN_MOVED_FROM))
+                continue
+            # Sidecars, thumbnails and temp files stop here
+            if not self.watcher._is_video_file(path):
+                continue
+
+            if mask & self.IN_CREATE:
+                self._created.add(path)
+            elif mask & self.IN_CLOSE_WRITE:
+                if path in self._created:
+                    self._created.discard(path)
+                    self.watcher.handle_file_event("created", path)
+                else:
+                    self.watcher.handle_file_event("modified", path)
+            elif mask & self.IN_MOVED_TO:
+                self.watcher.handle_file_event("moved", path)
+            elif mask & (self.IN_MOVED_FROM | self.IN_DELETE):
+                self._created.discard(path)
+                self.watcher.handle_file_event("deleted", path)
+
+
 # Global watcher instance
 _global_watcher = None
 
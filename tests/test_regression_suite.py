@@ -4,18 +4,26 @@ Regression suite: broader compatibility checks for ratings/favorites/tags/admin/
 
 from __future__ import annotations
 
+import base64
+from dataclasses import replace
+import json
+import os
 from pathlib import Path
 from uuid import uuid4
 
 import pytest
 from flask import render_template
 
+import cache_manager
 from backend.app.api.ratings import is_lan_origin
 from backend.app.factory import create_app
 from backend.app import legacy_runtime
 from backend.app.core.rate_limiter import RateLimiter
+from config import get_config
 from database_migration import VideoDatabase
 from backend.services.ratings_service import RatingsService
+from scripts.maintenance.file_watcher import FileChange, VideoFileWatcher
+import thumbnail_manager
 
 
 def _get_any_video(client):
@@ -427,3 +435,250 @@ def test_search_result_cards_keep_shared_contract(monkeypatch):
     body = response.get_data(as_text=True)
     assert 'class="video-tag-chips' in body
     assert 'class="video-metadata-row' in body
+
+
+# (added_date, rating, views) with plenty of ties, including NULL dates
+_PAGING_ROWS = {
+    "keyset-0.mp4": (None, 5, 3),
+    "keyset-1.mp4": (None, 5, 3),
+    "keyset-2.mp4": (100, 0, 0),
+    "keyset-3.mp4": (100, 0, 0),
+    "keyset-4.mp4": (100, 5, 3),
+    "keyset-5.mp4": (200, 0, 0),
+    "keyset-6.mp4": (None, 0, 3),
+}
+
+
+def _paging_cache(monkeypatch, tmp_path):
+    video_dir = tmp_path / "videos"
+    video_dir.mkdir()
+    db = VideoDatabase(str(tmp_path / "paging.db"))
+    with db.get_connection() as conn:
+        for filename, (added_date, rating, views) in _PAGING_ROWS.items():
+            (video_dir / filename).write_bytes(b"")
+            conn.execute("INSERT INTO videos (filename, added_date) VALUES (?, ?)", (filename, added_date))
+            # ratings/views stay authoritative; triggers copy them onto videos
+            if rating:
+                conn.execute("INSERT INTO ratings (filename, rating) VALUES (?, ?)", (filename, rating))
+            conn.execute("INSERT INTO views (filename, view_count) VALUES (?, ?)", (filename, views))
+        conn.commit()
+    cache = legacy_runtime.cache
+    monkeypatch.setattr(cache, "db", db)
+    monkeypatch.setattr(cache, "use_database", True)
+    monkeypatch.setattr(cache, "video_dir", str(video_dir))
+    monkeypatch.setattr(cache, "get_video_list", lambda: list(_PAGING_ROWS))
+    monkeypatch.setattr(legacy_runtime, "ensure_thumbnails_exist", lambda _: None)
+    return cache
+
+
+@pytest.mark.parametrize("sort_by,column", [("date", 0), ("rating", 1), ("views", 2)])
+@pytest.mark.parametrize("reverse", [True, False])
+def test_video_page_cursors_walk_tied_keys_both_ways(monkeypatch, tmp_path, sort_by, column, reverse):
+    cache = _paging_cache(monkeypatch, tmp_path)
+    expected = sorted(_PAGING_ROWS, key=lambda f: (_PAGING_ROWS[f][column] or 0, f), reverse=reverse)
+
+    pages, cursor = [], None
+    while True:
+        rows, next_cursor, prev_cursor = cache.get_video_page(sort_by, reverse, 2, cursor=cursor)
+        assert (prev_cursor is None) == (not pages)
+        pages.append([row["filename"] for row in rows])
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    assert [f for page in pages for f in page] == expected
+
+    # Back from the last page via prev cursors lands on the same pages
+    for page in reversed(pages[:-1]):
+        rows, next_cursor, prev_cursor = cache.get_video_page(sort_by, reverse, 2, cursor=prev_cursor)
+        assert [row["filename"] for row in rows] == page
+        assert next_cursor is not None
+    assert prev_cursor is None
+
+
+def test_video_page_cursor_round_trip_and_rejects_bad_input():
+    video = {"filename": "keyset-1.mp4", "added_date": None, "rating": 5, "views": 3}
+    cursor = cache_manager._encode_cursor("b", "rating", "desc", video)
+
+    assert cache_manager._decode_cursor(cursor, "rating", "desc") == ("b", (5, "keyset-1.mp4"))
+    assert cache_manager._decode_cursor(cursor, "views", "desc") is None
+    assert cache_manager._decode_cursor(cursor, "rating", "asc") is None
+    assert cache_manager._decode_cursor("not-a-cursor!", "rating", "desc") is None
+    assert cache_manager._decode_cursor("W10", "rating", "desc") is None  # valid base64 of "[]"
+
+
+def _forged_cursor(value) -> str:
+    raw = json.dumps(["a", "rating", "desc", value, "keyset-1.mp4"]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("value", [[1, 2], {"x": 1}, True])
+def test_forged_non_scalar_cursor_serves_first_page(monkeypatch, tmp_path, value):
+    assert cache_manager._decode_cursor(_forged_cursor(value), "rating", "desc") is None
+    _paging_cache(monkeypatch, tmp_path)
+    client = create_app().test_client()
+
+    response = client.get(f"/?sort=rating&order=desc&per_page=2&cursor={_forged_cursor(value)}")
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert "keyset-4.mp4" in body and "keyset-1.mp4" in body
+
+
+def test_index_bad_cursor_serves_first_page(monkeypatch, tmp_path):
+    _paging_cache(monkeypatch, tmp_path)
+    client = create_app().test_client()
+
+    response = client.get("/?sort=rating&order=desc&per_page=2&cursor=garbage")
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert "keyset-4.mp4" in body and "keyset-1.mp4" in body
+    assert "keyset-0.mp4" not in body
+
+
+def test_index_page_param_without_cursor_uses_offset(monkeypatch, tmp_path):
+    _paging_cache(monkeypatch, tmp_path)
+    client = create_app().test_client()
+
+    response = client.get("/?sort=views&order=asc&per_page=2&page=2")
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    # views asc: 2, 3 | 5, 0 | 1, 4 | 6
+    assert "keyset-5.mp4" in body and "keyset-0.mp4" in body
+    assert "keyset-3.mp4" not in body and "keyset-1.mp4" not in body
+    assert "cursor=" in body
+
+
+def _stream_client(monkeypatch, tmp_path, accel_prefix: str):
+    (tmp_path / "clip one.mp4").write_bytes(b"0123456789")
+    config = replace(get_config(), x_accel_redirect_prefix=accel_prefix)
+    monkeypatch.setattr(legacy_runtime, "get_config", lambda: config)
+    monkeypatch.setattr(legacy_runtime, "VIDEO_DIR", tmp_path)
+    return create_app().test_client()
+
+
+def test_stream_video_sends_bytes_without_accel_prefix(monkeypatch, tmp_path):
+    client = _stream_client(monkeypatch, tmp_path, "")
+
+    response = client.get("/video/clip one.mp4")
+    assert response.status_code == 200
+    assert response.data == b"0123456789"
+    assert "X-Accel-Redirect" not in response.headers
+
+    ranged = client.get("/video/clip one.mp4", headers={"Range": "bytes=2-4"})
+    assert ranged.status_code == 206
+    assert ranged.data == b"234"
+
+
+def test_stream_video_hands_off_to_nginx_with_accel_prefix(monkeypatch, tmp_path):
+    client = _stream_client(monkeypatch, tmp_path, "/_protected_videos/")
+
+    response = client.get("/video/clip one.mp4")
+    assert response.status_code == 200
+    assert response.headers["X-Accel-Redirect"] == "/_protected_videos/clip%20one.mp4"
+    assert response.headers["Content-Type"] == "video/mp4"
+    assert response.data == b""
+
+    assert client.get("/video/missing.mp4").status_code == 404
+    assert client.get("/video/..%2Fclip one.mp4").status_code == 404
+
+
+def test_favorites_list_newest_first(monkeypatch, tmp_path):
+    cache = _paging_cache(monkeypatch, tmp_path)
+    cache.invalidate_favorites()
+
+    cache.toggle_favorite("keyset-3.mp4")
+    cache.toggle_favorite("keyset-0.mp4")
+    returned = cache.toggle_favorite("keyset-5.mp4")
+    ours = [name for name in cache.get_favorites() if name.startswith("keyset-")]
+    assert ours == ["keyset-5.mp4", "keyset-0.mp4", "keyset-3.mp4"]
+    assert [name for name in returned if name.startswith("keyset-")] == ours
+
+    remaining = cache.toggle_favorite("keyset-0.mp4")
+    assert [name for name in remaining if name.startswith("keyset-")] == ["keyset-5.mp4", "keyset-3.mp4"]
+    cache.invalidate_favorites()
+
+
+def test_file_watcher_batch_invalidates_cache_and_saves_checksums(monkeypatch, tmp_path):
+    video_dir = tmp_path / "videos"
+    video_dir.mkdir()
+    clip = video_dir / "watched.mp4"
+    clip.write_bytes(b"watched")
+    monkeypatch.setattr(thumbnail_manager, "generate_async", lambda _: None)
+    cache = cache_manager.cache
+    assert isinstance(cache, cache_manager.VideoCache)
+
+    checksums = tmp_path / "data" / ".checksums.json"
+    watcher = VideoFileWatcher(str(video_dir), str(tmp_path / "thumbnails"), checksum_cache_path=str(checksums))
+    batches = []
+    watcher.set_callback("on_batch_processed", lambda changes, count: batches.append(count))
+
+    for event_type in ("created", "deleted"):
+        if event_type == "deleted":
+            clip.unlink()
+        monkeypatch.setitem(cache._last_refresh, "video_list", 1.0)
+        monkeypatch.setitem(cache._last_refresh, "metadata", 1.0)
+        watcher._process_batch([FileChange(str(clip), event_type, 0.0)])
+        assert cache._last_refresh["video_list"] == 0
+        assert cache._last_refresh["metadata"] == 0
+        known = json.loads(checksums.read_text(encoding="utf-8"))["files"]
+        assert (str(clip) in known) == (event_type == "created")
+    assert batches == [1, 1]
+
+
+def test_watch_page_context_feeds_widget_and_player_rating(monkeypatch, tmp_path):
+    (tmp_path / "rated.mp4").write_bytes(b"")
+    monkeypatch.setattr(legacy_runtime, "VIDEO_DIR", tmp_path)
+    watch_data = {
+        "rating": 4,
+        "views": 7,
+        "tags": [],
+        "favorites": ["rated.mp4"],
+        "related": [],
+        "related_total": 0,
+    }
+    monkeypatch.setattr(legacy_runtime.cache, "get_watch_page_data", lambda *_, **__: watch_data)
+    client = create_app().test_client()
+
+    page = client.get("/watch/rated.mp4")
+    assert page.status_code == 200
+    html = page.get_data(as_text=True)
+    # Main widget and the fullscreen player controls both show the rating
+    assert html.count('data-current="4"') == 2
+    assert 'data-current="0"' not in html
+    assert "Views: 7" in html
+
+
+def test_api_gallery_blob_follows_directory_listing(monkeypatch, tmp_path):
+    monkeypatch.setattr(legacy_runtime, "GALLERY_DIR", tmp_path)
+    monkeypatch.setattr(legacy_runtime, "_gallery_listing", legacy_runtime._EMPTY_GALLERY_LISTING)
+    client = create_app().test_client()
+
+    (tmp_path / "a.jpg").write_bytes(b"")
+    first = client.get("/api/gallery")
+    assert first.get_json() == {"images": ["a.jpg"]}
+
+    (tmp_path / "b.png").write_bytes(b"")
+    os.utime(tmp_path, ns=(0, tmp_path.stat().st_mtime_ns + 1))
+    second = client.get("/api/gallery")
+    assert second.get_json() == {"images": ["a.jpg", "b.png"]}
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert legacy_runtime._gallery_listing[1] == ("a.jpg", "b.png")
+
+
+def test_file_watcher_checksum_cache_defaults_beside_metadata_db(monkeypatch, tmp_path):
+    monkeypatch.setenv("LVS_DB_PATH", str(tmp_path / "data" / "video_metadata.db"))
+    watcher = VideoFileWatcher(str(tmp_path / "videos"), str(tmp_path / "static" / "thumbnails"))
+
+    assert watcher._checksum_cache_path == tmp_path / "data" / ".checksums.json"
+
+
+def test_related_video_pages_break_ties_by_filename(tmp_path):
+    db = VideoDatabase(str(tmp_path / "related.db"))
+    names = [f"related-{i}.mp4" for i in (3, 0, 4, 1, 2)]
+    with db.get_connection() as conn:
+        for name in ["target.mp4", *names]:
+            conn.execute("INSERT INTO videos (filename) VALUES (?)", (name,))
+            conn.execute("INSERT INTO video_tags (filename, tag) VALUES (?, ?)", (name, "shared"))
+        conn.commit()
+
+    pages = [[v["filename"] for v in db.get_related_videos("target.mp4", 2, offset)] for offset in (0, 2, 4)]
+    assert [name for page in pages for name in page] == sorted(names)
@@ -7,9 +7,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import queue
 import subprocess
+import threading
 from math import floor
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterable, List, Set
 
@@ -25,8 +27,15 @@ THUMB_LOG = Path("thumbnail_errors.log")
 # metadata JSON files at project root
 META_FILES = ["favorites.json", "ratings.json", "tags.json", "views.json"]
 
-# internal thread pool – thumbnails render in the background
-_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumb-gen")
+# Thumbnails render on long-lived worker threads fed by one queue
+THUMB_WORKERS = 2
+_THUMB_Q: "queue.SimpleQueue[str | Path | list | None]" = queue.SimpleQueue()
+_workers_lock = threading.Lock()
+_workers: List[threading.Thread] = []
+_workers_started = False
+# Videos queued or rendering; repeat page loads don't queue them again
+_queued: Set[str] = set()
+_queued_lock = threading.Lock()
 
 
 # Helpers
@@ -46,150 +55,244 @@ def thumb_path_for(video_filename: str | Path) -> Path:
 
 
 # Thumbnail generation
-def generate_async(video_filename: str | Path) -> None:
-    """Spawn a background thread to generate a thumbnail if missing."""
-
-    def _log(message: str) -> None:
-        try:
-            with THUMB_LOG.open("a", encoding="utf-8") as fh:
-                fh.write(f"{message}\n")
-        except Exception:
-            pass
-
-    def _probe_duration_seconds(video_path: Path) -> float | None:
-        """Return video duration in seconds using ffprobe, or None on error."""
-        cmd = [
-            "ffprobe",
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            str(video_path),
-        ]
-        try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=10,
-                check=True,
-                text=True,
-            )
-            duration = float(result.stdout.strip() or 0)
-            return duration if duration > 0 else None
-        except Exception:
-            return None
-
-    def _format_timestamp(seconds: float) -> str:
-        """Format seconds to ffmpeg-friendly HH:MM:SS.mmm string."""
-        seconds = max(0, seconds)
-        h = floor(seconds / 3600)
-        m = floor((seconds % 3600) / 60)
-        s = seconds % 60
-        return f"{h:02d}:{m:02d}:{s:06.3f}"
-
-    def _compute_timestamps(video_path: Path) -> list[str]:
-        """
-        Primary: 5:00 or 3:00 if shorter. Fallbacks: ~60s, 30s, 10s, 1s.
-        """
-        duration = _probe_duration_seconds(video_path)
-        target = 300.0  # 5 minutes
-        fallback = 180.0  # 3 minutes
-        candidates: list[str] = []
-
-        if duration is None:
-            _log(f"FFPROBE_MISSING {video_path.name} defaulting to 5m")
+def _log(message: str) -> None:
+    try:
+        with THUMB_LOG.open("a", encoding="utf-8") as fh:
+            fh.write(f"{message}\n")
+    except Exception:
+        pass
+
+
+def _probe_duration_seconds(video_path: Path) -> float | None:
+    """Return video duration in seconds using ffprobe, or None on error."""
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        str(video_path),
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=10,
+            check=True,
+            text=True,
+        )
+        duration = float(result.stdout.strip() or 0)
+        return duration if duration > 0 else None
+    except Exception:
+        return None
+
+
+def _format_timestamp(seconds: float) -> str:
+    """Format seconds to ffmpeg-friendly HH:MM:SS.mmm string."""
+    seconds = max(0, seconds)
+    h = floor(seconds / 3600)
+    m = floor((seconds % 3600) / 60)
+    s = seconds % 60
+    return f"{h:02d}:{m:02d}:{s:06.3f}"
+
+
+def _compute_timestamps(video_path: Path) -> list[str]:
+    """
+    Primary: 5:00 or 3:00 if shorter. Fallbacks: ~60s, 30s, 10s, 1s.
+    """
+    duration = _probe_duration_seconds(video_path)
+    target = 300.0  # 5 minutes
+    fallback = 180.0  # 3 minutes
+    candidates: list[str] = []
+
+    if duration is None:
+        _log(f"FFPROBE_MISSING {video_path.name} defaulting to 5m")
+        candidates.append(_format_timestamp(target))
+    else:
+        if duration >= target:
             candidates.append(_format_timestamp(target))
+        elif duration >= fallback:
+            candidates.append(_format_timestamp(fallback))
         else:
-            if duration >= target:
-                candidates.append(_format_timestamp(target))
-            elif duration >= fallback:
-                candidates.append(_format_timestamp(fallback))
-            else:
-                candidates.append(_format_timestamp(max(1.0, duration - 1.0)))
-
-            alt_point = min(duration - 1.0, 60.0) if duration and duration > 60 else max(5.0, (duration or 0) / 2 or 5)
-            candidates.append(_format_timestamp(max(1.0, alt_point)))
-
-        # Additional early fallbacks
-        candidates.extend([
-            _format_timestamp(30.0),
-            _format_timestamp(10.0),
-            _format_timestamp(1.0),
-        ])
-
-        seen = set()
-        deduped: list[str] = []
-        for ts in candidates:
-            if ts not in seen:
-                seen.add(ts)
-                deduped.append(ts)
-        return deduped
-
-    def _attempt_thumbnail(ts: str, tpath: Path, vpath: Path) -> bool:
-        """Run ffmpeg once for the given timestamp; return success flag."""
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-ss",
-            ts,
-            "-i",
-            str(vpath),
-            "-frames:v",
-            "1",
-            "-vf",
-            (
-                f"scale={THUMB_SIZE}:force_original_aspect_ratio=decrease,"
-                f"pad={THUMB_SIZE}:(320-iw)/2:(180-ih)/2"
-            ),
-            str(tpath),
-        ]
+            candidates.append(_format_timestamp(max(1.0, duration - 1.0)))
+
+        alt_point = min(duration - 1.0, 60.0) if duration and duration > 60 else max(5.0, (duration or 0) / 2 or 5)
+        candidates.append(_format_timestamp(max(1.0, alt_point)))
+
+    # Additional early fallbacks
+    candidates.extend([
+        _format_timestamp(30.0),
+        _format_timestamp(10.0),
+        _format_timestamp(1.0),
+    ])
+
+    seen = set()
+    deduped: list[str] = []
+    for ts in candidates:
+        if ts not in seen:
+            seen.add(ts)
+            deduped.append(ts)
+    return deduped
+
+
+def _attempt_thumbnail(ts: str, tpath: Path, vpath: Path) -> bool:
+    """Run ffmpeg once for the given timestamp; return success flag."""
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-ss",
+        ts,
+        "-i",
+        str(vpath),
+        "-frames:v",
+        "1",
+        "-vf",
+        (
+            f"scale={THUMB_SIZE}:force_original_aspect_ratio=decrease,"
+            f"pad={THUMB_SIZE}:(320-iw)/2:(180-ih)/2"
+        ),
+        str(tpath),
+    ]
+    try:
+        subprocess.run(
+            cmd,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=90,
+        )
+        print(f"[THUMB] ✓ {tpath.name} @ {ts}")
+        _log(f"OK {vpath.name} @ {ts}")
+        return True
+    except subprocess.TimeoutExpired:
+        print(f"[THUMB] ✖ timeout generating {vpath.name} @ {ts}")
+        _log(f"TIMEOUT {vpath.name} @ {ts}")
+        return False
+    except subprocess.CalledProcessError as e:
+        print(f"[THUMB] ✖ ffmpeg error for {vpath.name} @ {ts}: {e}")
+        stderr = e.stderr.decode("utf-8", "ignore") if getattr(e, "stderr", None) else str(e)
+        _log(f"FFMPEG_ERROR {vpath.name} @ {ts} :: {stderr}")
+        return False
+
+
+def _generate_one(video_filename: str | Path) -> None:
+    """Render one thumbnail unless it already exists; runs on a worker thread."""
+    vpath = VIDEO_DIR / video_filename
+    tpath = thumb_path_for(video_filename)
+
+    if tpath.exists() or not vpath.exists():
+        return  # nothing to do
+
+    THUMB_DIR.mkdir(parents=True, exist_ok=True)
+
+    for ts in _compute_timestamps(vpath):
+        if _attempt_thumbnail(ts, tpath, vpath):
+            return
+
+
+def _thumb_worker() -> None:
+    """Drain the job queue; a list item is a batch still to be filtered, None stops the worker."""
+    while True:
+        item = _THUMB_Q.get()
+        if item is None:
+            return
         try:
-            subprocess.run(
-                cmd,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=90,
-            )
-            print(f"[THUMB] ✓ {tpath.name} @ {ts}")
-            _log(f"OK {vpath.name} @ {ts}")
-            return True
-        except subprocess.TimeoutExpired:
-            print(f"[THUMB] ✖ timeout generating {vpath.name} @ {ts}")
-            _log(f"TIMEOUT {vpath.name} @ {ts}")
-            return False
-        except subprocess.CalledProcessError as e:
-            print(f"[THUMB] ✖ ffmpeg error for {vpath.name} @ {ts}: {e}")
-            stderr = e.stderr.decode("utf-8", "ignore") if getattr(e, "stderr", None) else str(e)
-            _log(f"FFMPEG_ERROR {vpath.name} @ {ts} :: {stderr}")
-            return False
-
-    def _worker() -> None:
-        vpath = VIDEO_DIR / video_filename
-        tpath = thumb_path_for(video_filename)
-
-        if tpath.exists() or not vpath.exists():
-            return  # nothing to do
-
-        THUMB_DIR.mkdir(parents=True, exist_ok=True)
-
-        for ts in _compute_timestamps(vpath):
-            if _attempt_thumbnail(ts, tpath, vpath):
-                return
-
-    _pool.submit(_worker)
+            if isinstance(item, list):
+                for fname in _missing_thumbs(item):
+                    generate_async(fname)
+            else:
+                _generate_one(item)
+        except Exception as e:
+            print(f"[THUMB] ✖ worker error for {item!r}: {e}")
+        finally:
+            if not isinstance(item, list):
+                with _queued_lock:
+                    _queued.discard(str(item))
+
+
+def _ensure_workers() -> None:
+    global _workers_started
+    if _workers_started:
+        return
+    with _workers_lock:
+        if not _workers_started:
+            for i in range(THUMB_WORKERS):
+                worker = threading.Thread(target=_thumb_worker, name=f"thumb-gen-{i}", daemon=True)
+                worker.start()
+                _workers.append(worker)
+            _workers_started = True
+
+
+def shutdown() -> None:
+    """Let the workers finish everything already queued, then stop them."""
+    global _workers_started
+    with _workers_lock:
+        for _ in _workers:
+            _THUMB_Q.put(None)
+        for worker in _workers:
+            worker.join()
+        _workers.clear()
+        _workers_started = False
 
 
-# Maintenance - sync()
-def _valid_video_files() -> List[Path]:
+def generate_async(video_filename: str | Path) -> None:
+    """Queue a thumbnail for background generation if missing."""
+    key = str(video_filename)
+    with _queued_lock:
+        if key in _queued:
+            return
+        _queued.add(key)
+    _ensure_workers()
+    _THUMB_Q.put(video_filename)
+
+
+def _missing_thumbs(video_filenames: Iterable[str | Path]) -> List[str | Path]:
+    """Videos without a thumbnail, from one THUMB_DIR listing instead of a stat each."""
+    try:
+        with os.scandir(THUMB_DIR) as it:
+            existing = {entry.name for entry in it}
+    except FileNotFoundError:
+        existing = set()
     return [
-        p for p in VIDEO_DIR.iterdir() if p.suffix.lower() in VIDEO_EXTS and p.is_file()
+        fname
+        for fname in video_filenames
+        if f"{_video_stem_exact(fname)}{THUMB_EXT}" not in existing
     ]
 
 
+def generate_missing_async(video_filenames: Iterable[str | Path]) -> int:
+    """Queue thumbnails only for videos that have none; returns jobs queued."""
+    missing = _missing_thumbs(video_filenames)
+    for fname in missing:
+        generate_async(fname)
+    return len(missing)
+
+
+def queue_missing(video_filenames: Iterable[str | Path]) -> None:
+    """Like generate_missing_async, but the thumbnail-dir check also runs on the worker."""
+    _ensure_workers()
+    _THUMB_Q.put(list(video_filenames))
+
+
+# Maintenance - sync()
+def _valid_video_files() -> List[Path]:
+    # scandir's entry.is_file() uses the dirent type, not a stat() per video
+    with os.scandir(VIDEO_DIR) as it:
+        return [
+            Path(entry.path)
+            for entry in it
+            if os.path.splitext(entry.name)[1].lower() in VIDEO_EXTS and entry.is_file()
+        ]
+
+
+def _thumb_files() -> List[Path]:
+    with os.scandir(THUMB_DIR) as it:
+        return [Path(entry.path) for entry in it if entry.name.endswith(THUMB_EXT)]
+
+
 def _clean_metadata(valid_stems_ci: Set[str]) -> None:
     """Remove references to missing videos in all META_FILES."""
     for meta in META_FILES:
@@ -232,7 +335,7 @@ def _clean_database(valid_stems_ci: Set[str]) -> None:
         if not (cache.use_database and cache.db):
             return
 
-        for vid in cache.db.get_all_filenames():
+        for vid in cache.db.get_all_filenames_set():
             if _video_stem_ci(vid) not in valid_stems_ci:
                 cache.db.delete_video_by_filename(vid)
                 print(f"[DB] removed row {vid}")
@@ -255,7 +358,7 @@ def sync(force_regen: bool = False) -> None:
 
     video_files = _valid_video_files()
     valid_stems_ci = {_video_stem_ci(p.name) for p in video_files}
-    thumb_files = list(THUMB_DIR.glob(f"*{THUMB_EXT}"))
+    thumb_files = _thumb_files()
     thumb_stems_ci = {_video_stem_ci(p.name) for p in thumb_files}
 
     # 1) Remove orphan thumbnails (no matching video)
@@ -266,7 +369,7 @@ def sync(force_regen: bool = False) -> None:
 
     # 2) Optionally delete all remaining thumbnails (full rebuild)
     if force_regen:
-        for thumb in THUMB_DIR.glob(f"*{THUMB_EXT}"):
+        for thumb in _thumb_files():
             thumb.unlink(missing_ok=True)
         thumb_stems_ci.clear()
         print("[SYNC] 🔁 forced full rebuild - all thumbs removed")
@@ -301,13 +404,7 @@ def retry_failed_thumbnails(log_path: Path = THUMB_LOG) -> int:
             fname, _, _ = rest.partition(" @ ")
             failed.add(fname.strip())
 
-    queued = 0
-    for fname in failed:
-        tpath = thumb_path_for(fname)
-        if tpath.exists():
-            continue
-        generate_async(fname)
-        queued += 1
+    queued = generate_missing_async(failed)
 
     print(f"[RETRY] queued {queued} retry job(s)")
     return queued
@@ -334,7 +431,7 @@ def _cli() -> None:
         sync(force_regen=args.force)
 
     # wait for background jobs to finish before exiting
-    _pool.shutdown(wait=True)
+    shutdown()
 
 
 if __name__ == "__main__":